@@ -1,15 +1,17 @@
 import streamlit as st
 from streamlit_option_menu import option_menu
 
-from components.production_request import ProductionRequestForm, ProductionRequestFormDB
-from components.production_request_dashboad import ProductionDashboard
+from components import production_request_dashboad  # noqa: F401 (registers its page)
+from components.pages import render_page
+from components.production_request import ProductionRequestFormDB
+from databases.production_request_form import declare_range, range_key
+from databases.snapshots import on_snapshot_reconciled
+from utils.shared_dataset import shared_dataset
 
-# ------------------ Initialize ------------------ #
-prod_form = ProductionRequestForm()
-prod_dashboard = ProductionDashboard()
+declare_range(st.secrets["SPREADSHEET_PRODUCTION_REQUEST_FORM_READ"], "R:X")
 
 
-@st.cache_data(show_spinner="Loading production request data...", ttl=600)
+@shared_dataset(show_spinner="Loading production request data...", ttl=600)
 def load_data_info():
     prod_db = ProductionRequestFormDB(
         range_name="R:X",
@@ -18,6 +20,12 @@ def load_data_info():
     return prod_db.get_df()
 
 
+on_snapshot_reconciled(
+    "data_info",
+    load_data_info.invalidate,
+    range_key(st.secrets["SPREADSHEET_PRODUCTION_REQUEST_FORM_READ"], "R:X"),
+)
+
 df = load_data_info()
 title = lambda x: df.iloc[x, 0]
 logo = lambda x: df.iloc[x, 1]
@@ -65,11 +73,11 @@ if main_menu == "Production":
         default_index=0,
     )
 
-    # Render the selected page
+    # Only the selected page is built (DB objects, data) and rendered
     if selected_page == title(3):
-        prod_form.render_form()
+        render_page("production_form")
     elif selected_page == title(4):
-        prod_dashboard.render_dashboard()
+        render_page("production_dashboard")
 
 elif main_menu == "Maintenance":
     st.info("🛠 Maintenance page coming soon!")
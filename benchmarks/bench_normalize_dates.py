@@ -0,0 +1,75 @@
+"""
+Compare the old normalize_dates with databases.schema.parse_dates.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_normalize_dates [rows]
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from databases.schema import parse_dates
+
+
+def legacy_normalize_dates(df, date_col):
+    """normalize_dates as it was before the single-pass converter."""
+    df[date_col] = df[date_col].astype(str).str.strip()
+    is_numeric = df[date_col].str.match(r"^\d+(\.\d+)?$")
+    numeric_part = df.loc[is_numeric, date_col].astype(float)
+    text_part = df.loc[~is_numeric, date_col]
+    converted_numeric = pd.to_datetime("1899-12-30") + pd.to_timedelta(
+        numeric_part, unit="D"
+    )
+    converted_text = pd.to_datetime(text_part, errors="coerce")
+    df.loc[is_numeric, date_col] = converted_numeric
+    df.loc[~is_numeric, date_col] = converted_text
+    df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
+    return df.dropna(subset=[date_col])
+
+
+def make_column(rows: int) -> pd.Series:
+    """Sheet-like date column: mostly ISO strings, some serials, a few blanks."""
+    rng = np.random.default_rng(0)
+    days = rng.integers(0, 3 * 365, rows)
+    iso = (pd.Timestamp("2023-01-01") + pd.to_timedelta(days, unit="D")).strftime(
+        "%Y-%m-%d"
+    )
+    values = np.asarray(iso, dtype=object)
+    serial = rng.random(rows) < 0.2
+    values[serial] = (days[serial] + 44927).astype(str)
+    values[rng.random(rows) < 0.01] = None
+    return pd.Series(values, dtype=object)
+
+
+def best_of(fn, repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(rows: int = 1_000_000):
+    column = make_column(rows)
+    frame = pd.DataFrame({"date": column})
+
+    legacy = best_of(lambda: legacy_normalize_dates(frame.copy(), "date"))
+    single = best_of(lambda: parse_dates(column))
+
+    expected = legacy_normalize_dates(frame.copy(), "date")["date"]
+    result = parse_dates(column)
+    assert result[result.notna()].equals(expected), "results differ"
+
+    print(f"rows:           {rows:,}")
+    print(f"legacy:         {legacy:.3f} s")
+    print(f"single pass:    {single:.3f} s")
+    print(f"speedup:        {legacy / single:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,102 @@
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from databases.schema import parse_dates
+
+# Dimension name -> column positions of the STORED request sheet
+REQUEST_DIMENSIONS = {
+    "user": (0,),
+    "type": (1,),
+    "team": (2,),
+    "room": (6,),
+    "building": (7,),
+    "zone": (8,),
+    "place": (6, 7, 8),
+}
+# Position of the date every view is filtered and bucketed by
+REQUEST_DATE = 14
+
+
+class RequestCube:
+    """
+    Request counts per date x dimension, built once per data version.
+
+    Every dashboard view over a date range is answered by slicing these small
+    count tables and summing, never by scanning the raw request rows again.
+    Rows whose date cannot be parsed are left out, as the charts always did.
+
+    Positions refer to the full sheet. Pass its header row as `headers` when
+    `df` holds only some of the columns, so they are looked up by name.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        date_index: int = REQUEST_DATE,
+        dimensions: Optional[Dict[str, Sequence[int]]] = None,
+        headers: Optional[Sequence[str]] = None,
+    ):
+        dimensions = REQUEST_DIMENSIONS if dimensions is None else dimensions
+        names = list(df.columns) if headers is None else list(headers)
+
+        def column(position: int) -> Optional[pd.Series]:
+            name = names[position] if position < len(names) else None
+            if name is None or name not in df.columns:
+                return None
+            return df[name]
+
+        date = column(date_index)
+        if date is None:
+            # No date column (e.g. renamed in the sheet): nothing to bucket by
+            self.date_col = "date"
+            dates = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+        else:
+            self.date_col = date.name
+            dates = parse_dates(date)
+        valid = dates.notna()
+
+        self.totals: pd.Series = dates[valid].value_counts().sort_index()
+        self.totals.index.name = self.date_col
+        self.columns: Dict[str, List[str]] = {}
+        self.counts: Dict[str, pd.Series] = {}
+
+        keys = dates[valid].rename(self.date_col)
+        for name, positions in dimensions.items():
+            columns = [column(i) for i in positions]
+            if any(labels is None for labels in columns):
+                continue
+            labels = [labels[valid] for labels in columns]
+            self.columns[name] = [label.name for label in labels]
+            self.counts[name] = (
+                pd.concat([keys, *labels], axis=1)
+                .groupby([self.date_col, *self.columns[name]], observed=True)
+                .size()
+            )
+
+    @property
+    def empty(self) -> bool:
+        return self.totals.empty
+
+    def date_range(self) -> Tuple[pd.Timestamp, pd.Timestamp]:
+        return self.totals.index.min(), self.totals.index.max()
+
+    @staticmethod
+    def _window(index: pd.Index, start: date, end: date):
+        # Inclusive on calendar days, like comparing `.dt.date`
+        return (index >= pd.Timestamp(start)) & (
+            index < pd.Timestamp(end) + timedelta(days=1)
+        )
+
+    def over_time(self, start: date, end: date) -> pd.Series:
+        """Requests per date in the range, oldest first."""
+        return self.totals[self._window(self.totals.index, start, end)]
+
+    def by(self, name: str, start: date, end: date) -> pd.Series:
+        """Requests per label of a dimension in the range, most frequent first."""
+        counts = self.counts[name]
+        window = counts[self._window(counts.index.get_level_values(0), start, end)]
+        levels = list(range(1, counts.index.nlevels))
+        summed = window.groupby(level=levels, observed=True).sum()
+        return summed[summed > 0].sort_values(ascending=False, kind="stable")
@@ -0,0 +1,23 @@
+from typing import Any, Callable, Dict, Tuple
+
+# Page key -> (factory, name of the method that renders it). Pages are built
+# only when selected, so other pages' DB objects and data are never touched.
+_pages: Dict[str, Tuple[Callable[[], Any], str]] = {}
+
+
+def register_page(key: str, render: str = "render"):
+    """Class decorator signing a page up under `key`; `render` is its draw method."""
+
+    def decorator(factory):
+        _pages[key] = (factory, render)
+        return factory
+
+    return decorator
+
+
+def render_page(key: str):
+    """Build the page registered under `key` and draw it."""
+    factory, render = _pages[key]
+    page = factory()
+    getattr(page, render)()
+    return page
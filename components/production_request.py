@@ -1,6 +1,8 @@
 import json
+from dataclasses import dataclass, field
+from concurrent.futures import Future
 from datetime import date, time
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import pandas as pd
 import requests
@@ -10,34 +12,121 @@ from streamlit_tags import st_tags
 
 from databases.production_request_form import (
     ProductionRequestFormDB,
+    declare_range,
+    fetch_headers,
+    range_key,
 )
+from databases.snapshots import on_snapshot_reconciled
+from utils.google_sheets_client import GoogleSheetsClient
+from utils.image_pipeline import submit_preprocess
+from utils.shared_dataset import shared_dataset
+from utils.telegram_notifier import TelegramNotifier
+
+from .pages import register_page
+
+# Columns of the READ sheet offered as plain option lists
+OPTION_COLUMNS = (0, 1, 2, 5, 8, 10)
+# Columns the form reads rows of: the option lists plus room (6) and building (7).
+# The other columns only supply question labels, which come from the header row.
+FORM_COLUMNS = (0, 1, 2, 5, 6, 7, 8, 10)
+
+declare_range(
+    st.secrets["SPREADSHEET_PRODUCTION_REQUEST_FORM_READ"], "A:T", columns=FORM_COLUMNS
+)
+
+
+def get_form_headers() -> list:
+    """Full header row (A:T) of the READ sheet: the form's question labels."""
+    sheet_id = GoogleSheetsClient.extract_spreadsheet_id(
+        st.secrets["SPREADSHEET_PRODUCTION_REQUEST_FORM_READ"]
+    )
+    return fetch_headers(sheet_id, "sheet1", "A:T")
 
 
-@st.cache_data(show_spinner="Loading production request data...", ttl=600)
+@shared_dataset(show_spinner="Loading production request data...", ttl=600)
 def load_production_info_data():
     db = ProductionRequestFormDB(
         range_name="A:T",
         spreadsheet=st.secrets["SPREADSHEET_PRODUCTION_REQUEST_FORM_READ"],
+        columns=FORM_COLUMNS,
     )
     df = db.get_df()
     return df
 
 
+on_snapshot_reconciled(
+    "production_info_data",
+    load_production_info_data.invalidate,
+    range_key(
+        st.secrets["SPREADSHEET_PRODUCTION_REQUEST_FORM_READ"],
+        "A:T",
+        columns=FORM_COLUMNS,
+    ),
+)
+
+
+@dataclass
+class FormOptions:
+    """Every dropdown of the request form, precomputed from one data version."""
+
+    lists: Dict[int, List[str]] = field(default_factory=dict)
+    # zone -> sorted buildings, (zone, building) -> sorted rooms
+    buildings: Dict[str, List[str]] = field(default_factory=dict)
+    rooms: Dict[Tuple[str, str], List[str]] = field(default_factory=dict)
+
+
+def build_form_options(df: pd.DataFrame, headers: List[str]) -> FormOptions:
+    """`headers` is the full header row; `df` may hold only some of its columns."""
+    options = FormOptions()
+    names = {
+        i: headers[i]
+        for i in FORM_COLUMNS
+        if i < len(headers) and headers[i] in df.columns
+    }
+    for col_index in OPTION_COLUMNS:
+        if col_index in names:
+            options.lists[col_index] = df[names[col_index]].dropna().unique().tolist()
+
+    if all(i in names for i in (6, 7, 8)):
+        places = df[[names[8], names[7], names[6]]].dropna(subset=[names[8], names[7]])
+        places.columns = ["zone", "building", "room"]
+        for zone, group in places.groupby("zone", sort=False):
+            options.buildings[zone] = sorted(group["building"].unique())
+        rooms = places.dropna(subset=["room"]).drop_duplicates()
+        for (zone, building), group in rooms.groupby(["zone", "building"], sort=False):
+            options.rooms[(zone, building)] = sorted(group["room"])
+    return options
+
+
+def get_form_options() -> FormOptions:
+    """Form options for the current info data, rebuilt only when it changes."""
+    headers = get_form_headers()
+    return load_production_info_data.derive(
+        "form_options", lambda df: build_form_options(df, headers)
+    )
+
+
+@st.cache_resource
+def get_telegram_notifier(bot_token: str) -> TelegramNotifier:
+    """One pooled Telegram client per process, shared by every session."""
+    return TelegramNotifier(bot_token)
+
+
+@register_page("production_form", render="render_form")
 class ProductionRequestForm:
     """Class to manage Production Request Form with Google Sheets and Streamlit."""
 
     def __init__(self):
-        # Initialize DB connections
-        self.db_read = st.secrets["SPREADSHEET_PRODUCTION_REQUEST_FORM_READ"]
+        # Initialize DB connections (options are read through load_production_info_data)
         self.db_write = st.secrets["SPREADSHEET_PRODUCTION_REQUEST_FORM_STORED"]
-        self.db_stored = ProductionRequestFormDB(
-            range_name="A:O",
-            spreadsheet=self.db_write,
-        )
-        self.db_read = ProductionRequestFormDB(
-            range_name="A:Q",
-            spreadsheet=self.db_read,
-        )
+        try:
+            self.db_stored = ProductionRequestFormDB(
+                range_name="A:O",
+                spreadsheet=self.db_write,
+            )
+        except Exception as e:
+            st.error(f"❌ Failed to read spreadsheet headers: {e}")
+            st.stop()
 
     # ------------------ Google Sheets / SheetDB ------------------ #
     @staticmethod
@@ -62,48 +151,46 @@ class ProductionRequestForm:
 
         return response
 
+    @staticmethod
+    def start_image_preprocessing(image):
+        """Downscale/recompress an uploaded image in the background; returns a Future."""
+        if image is None:
+            return None
+        return submit_preprocess(
+            image,
+            max_dimension=int(st.secrets.get("IMAGE_MAX_DIMENSION", 1600)),
+            image_format=st.secrets.get("IMAGE_FORMAT", "JPEG"),
+            quality=int(st.secrets.get("IMAGE_QUALITY", 82)),
+        )
+
     def send_telegram_message(
-        self, image_file, chat_ids: List[str], message: str
-    ) -> Dict[str, bool]:
-        bot_token = st.secrets.get("TELEGRAM_TOKEN")
-        base_url = f"https://api.telegram.org/bot{bot_token}"
-        results = {}
-
-        # read file once into memory
-        file_bytes = None
+        self,
+        image_file,
+        chat_ids: List[str],
+        message: str,
+        image_future: Optional[Future] = None,
+    ) -> Future:
+        """
+        Queue the notification and return at once. It goes out from the
+        notifier's thread once `image_future` (the preprocessed image) is done.
+        """
+        notifier = get_telegram_notifier(st.secrets.get("TELEGRAM_TOKEN"))
+
+        # read file once into memory, here: the upload is tied to this script run
+        original = (None, "image.jpg")
         if image_file is not None:
-            file_bytes = image_file.read()
-            image_file.seek(0)  # reset pointer so Streamlit can still use it
-
-        for chat_id in chat_ids:
-            try:
-                # send text message
-                resp = requests.post(
-                    f"{base_url}/sendMessage",
-                    data={
-                        "chat_id": chat_id,
-                        "text": message,
-                        "parse_mode": "Markdown",
-                    },
-                )
-                results[chat_id] = resp.status_code == 200
-
-                # send image if provided
-                if file_bytes:
-                    files = {"photo": ("image.jpg", file_bytes)}
-                    resp_img = requests.post(
-                        f"{base_url}/sendPhoto",
-                        data={"chat_id": chat_id},
-                        files=files,
-                    )
+            original = (image_file.getvalue() or None, "image.jpg")
 
-                    results[chat_id] = results[chat_id] and resp_img.status_code == 200
+        def attachment():
+            if image_future is not None:
+                try:
+                    processed = image_future.result()
+                    return processed.data, processed.filename
+                except Exception:
+                    pass  # Not decodable by Pillow: send the original file as before
+            return original
 
-            except Exception as e:
-                results[chat_id] = False
-                st.error(f"❌ Failed to send message to chat ID {chat_id}: {e}")
-
-        return results
+        return notifier.send_async(chat_ids, message, attachment)
 
     @staticmethod
     def format_request_message(questions: dict, data: dict) -> str:
@@ -123,7 +210,7 @@ class ProductionRequestForm:
         lines.append(f"📍 *{questions(8)}*: {data.get(questions(8), '—')}")
         lines.append(f"📞 *{questions(9)}*: {data.get(questions(9), '—')}")
         lines.append("")
-        lines.append(f"📅 *{questions(13)}*: {data.get(questions(13), "-")}")
+        lines.append(f"📅 *{questions(13)}*: {data.get(questions(13), '-')}")
         lines.append(f"📅 *{questions(14)}*: {data.get(questions(14), '—')}")
         lines.append(f"⏰ *{questions(19)}*: {data.get(questions(19), '—')}")
 
@@ -152,44 +239,43 @@ class ProductionRequestForm:
         return df[df.columns[col_index]].dropna().unique().tolist()
 
     @staticmethod
-    def get_form_question(df: pd.DataFrame, col: int) -> Optional[str]:
+    def get_form_question(headers: List[str], col: int) -> Optional[str]:
         try:
-            return df.columns[col]
+            return headers[col]
         except IndexError:
             return None
 
     # ------------------ Streamlit Form ------------------ #
     def render_form(self):
         df = self.load_data()
-        questions = lambda x: self.get_form_question(df, x)
+        try:
+            headers = get_form_headers()
+        except Exception as e:
+            st.error(f"❌ Failed to read spreadsheet headers: {e}")
+            st.stop()
+        questions = lambda x: self.get_form_question(headers, x)
 
         # --- Reactive cascading selects (outside form) ---
+        options = get_form_options()
         col1, col2, col3 = st.columns(3)
         with col1:
-            df_new = df.iloc[:, [6, 7, 8]].copy()
             zoon = st.selectbox(
                 self.safe_label(questions(8), "Zoon *"),
-                self.get_list(df, 8),
+                options.lists.get(8, []),
                 key="zoon",
             )
 
         with col2:
-            filtered_buildings = df_new[df_new[questions(8)] == zoon][
-                questions(7)
-            ].unique()
             building = st.selectbox(
                 self.safe_label(questions(7), "Building *"),
-                sorted(filtered_buildings),
+                options.buildings.get(zoon, []),
                 key="building",
             )
 
         with col3:
-            filtered_rooms = df_new[
-                (df_new[questions(8)] == zoon) & (df_new[questions(7)] == building)
-            ][questions(6)].unique()
             room = st.selectbox(
                 self.safe_label(questions(6), "Room *"),
-                sorted(filtered_rooms),
+                options.rooms.get((zoon, building), []),
                 key="room",
             )
 
@@ -203,11 +289,12 @@ class ProductionRequestForm:
             # --- User input ---
             col1, col2 = st.columns(2)
             with col1:
-                options = self.get_list(df, 0)
-                username = st.selectbox(self.safe_label(questions(0)), options)
+                username = st.selectbox(
+                    self.safe_label(questions(0)), options.lists.get(0, [])
+                )
             with col2:
                 assigned_to = st.selectbox(
-                    self.safe_label(questions(1), "Assign To"), self.get_list(df, 1)
+                    self.safe_label(questions(1), "Assign To"), options.lists.get(1, [])
                 )
 
             col1, col2, col3 = st.columns([2, 2, 1])
@@ -225,7 +312,7 @@ class ProductionRequestForm:
                 )
             selected_topic = option_menu(
                 menu_title=self.safe_label(questions(2), "Topic *"),
-                options=self.get_list(df, 2)[:-1],
+                options=options.lists.get(2, [])[:-1],
                 styles={
                     "container": {"background-color": "#86e6864a"},
                     "nav-link": {
@@ -256,7 +343,7 @@ class ProductionRequestForm:
                 )
             with col2:
                 unit = st.selectbox(
-                    self.safe_label(questions(5), "Unit *"), self.get_list(df, 5)
+                    self.safe_label(questions(5), "Unit *"), options.lists.get(5, [])
                 )
 
             # --- New: User image upload ---
@@ -349,6 +436,9 @@ class ProductionRequestForm:
 
         st.success("Form submitted successfully!")
 
+        # Shrink the attachment while the row is being queued
+        image_future = self.start_image_preprocessing(image)
+
         # --- Prepare data for Google Sheet ---
         data = {
             f"{self.safe_label(questions(0), 'Name')}": username,
@@ -384,9 +474,10 @@ class ProductionRequestForm:
             st.error(f"Failed to write data to sheet: {e}")
 
         # Optional: send Telegram message
-        chat_ids = self.get_list(df, 10)
+        chat_ids = get_form_options().lists.get(10, [])
         message = self.format_request_message(
             lambda x: self.safe_label(questions(x)), data
         )
-        file_id = self.send_telegram_message(image, chat_ids, message)
+        # Sent in the background once the image is ready; the rerun is not held up
+        self.send_telegram_message(image, chat_ids, message, image_future)
         # st.info(f"file id: {file_id}")
@@ -1,25 +1,83 @@
+import math
+from typing import Optional
+
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import streamlit as st
-
-from databases.production_request_form import ProductionRequestFormDB
-
-from .production_request import ProductionRequestForm
-
-prod_form = ProductionRequestForm()
-get_form_questions = prod_form.get_form_question
+from streamlit_option_menu import option_menu
+
+from databases.production_request_form import (
+    ProductionRequestFormDB,
+    SheetTail,
+    declare_range,
+    on_rows_appended,
+    range_key,
+)
+from databases.schema import STORED_SCHEMA
+from databases.snapshots import on_snapshot_reconciled
+from utils.figure_cache import DEFAULT_MAX_FIGURES, FigureCache
+from utils.shared_dataset import shared_dataset
+
+from .dashboard_cube import RequestCube
+from .pages import register_page
+
+# Columns of the STORED sheet the metrics and charts read: user, type, team,
+# room, building, zone, request date and to date. The data explorer shows every
+# column, so the full range is only fetched once it is opened.
+DASHBOARD_COLUMNS = (0, 1, 2, 6, 7, 8, 13, 14)
+
+declare_range(
+    st.secrets["SPREADSHEET_PRODUCTION_REQUEST_FORM_STORED"],
+    "A:P",
+    columns=DASHBOARD_COLUMNS,
+)
+declare_range(
+    st.secrets["SPREADSHEET_PRODUCTION_REQUEST_FORM_READ"], "A:P", sheet_name="dashboard"
+)
+
+@st.cache_resource
+def get_production_request_tail() -> SheetTail:
+    """Process-wide copy of the append-only request log, synced incrementally."""
+    db = ProductionRequestFormDB(
+        range_name="A:P",
+        spreadsheet=st.secrets["SPREADSHEET_PRODUCTION_REQUEST_FORM_STORED"],
+        schema=STORED_SCHEMA,
+        columns=DASHBOARD_COLUMNS,
+    )
+    return SheetTail(db)
 
 
-@st.cache_data(show_spinner="Loading production request data...", ttl=3600)
-def load_production_request_data():
+@st.cache_resource
+def get_request_log_tail() -> SheetTail:
+    """Process-wide copy of every column of the request log, for the data explorer."""
     db = ProductionRequestFormDB(
         range_name="A:P",
         spreadsheet=st.secrets["SPREADSHEET_PRODUCTION_REQUEST_FORM_STORED"],
+        schema=STORED_SCHEMA,
     )
-    df = db.get_df()
+    return SheetTail(db)
+
+
+def request_column(position: int):
+    """Name of a STORED sheet column by its position in the full header row."""
+    headers = get_request_headers()
+    return headers[position] if position < len(headers) else None
+
+
+@shared_dataset(show_spinner="Loading production request data...", ttl=3600)
+def load_production_request_data():
+    # After the first full load only rows appended since the last sync are fetched
+    df = get_production_request_tail().sync()
     return df
 
-@st.cache_data(show_spinner="Loading production request data...", ttl=3600)
+
+@shared_dataset(show_spinner="Loading all request columns...", ttl=3600)
+def load_request_log_data():
+    # Loaded the first time the data explorer is opened, then synced like the above
+    return get_request_log_tail().sync()
+
+@shared_dataset(show_spinner="Loading production request data...", ttl=3600)
 def load_production_info_data():
     db = ProductionRequestFormDB(
             range_name="A:P",
@@ -29,50 +87,128 @@ def load_production_info_data():
     df = db.get_df()
     return df
 
-def normalize_dates(df, date_col):
-    # Convert all to string first (to avoid weird mixed-type issues)
-    df[date_col] = df[date_col].astype(str).str.strip()
 
-    # Detect Excel-style numbers (like "45938")
-    is_numeric = df[date_col].str.match(r"^\d+(\.\d+)?$")
+def patch_production_request_data(sheet_id, sheet_name, first_row, rows):
+    """Write-through: show newly appended requests without re-reading the sheet."""
+    tail = get_production_request_tail()
+    if tail.apply_append(sheet_id, sheet_name, first_row, rows):
+        # Swapping bumps the dataset version, so anything keyed on it is rebuilt
+        load_production_request_data.swap(tail.df)
+    elif sheet_id == tail.db.sheet_id:
+        tail.mark_stale()
+        load_production_request_data.invalidate()
+
+    if not load_request_log_data.loaded:
+        return  # the explorer has not been opened; nothing to patch
+    log_tail = get_request_log_tail()
+    if log_tail.apply_append(sheet_id, sheet_name, first_row, rows):
+        load_request_log_data.swap(log_tail.df)
+    elif sheet_id == log_tail.db.sheet_id:
+        log_tail.mark_stale()
+        load_request_log_data.invalidate()
+
+
+def get_request_headers() -> list:
+    """STORED header row as the loaded request log names its columns."""
+    db = get_production_request_tail().db
+    return load_production_request_data.derive("headers", db.frame_headers)
+
+
+def get_request_cube() -> RequestCube:
+    """Per-date count cube of the request log, rebuilt only when the log changes."""
+    db = get_production_request_tail().db
+    return load_production_request_data.derive(
+        "cube", lambda df: RequestCube(df, headers=db.frame_headers(df))
+    )
 
-    # Split numeric vs text for safe conversion
-    numeric_part = df.loc[is_numeric, date_col].astype(float)
-    text_part = df.loc[~is_numeric, date_col]
 
-    # Convert numeric (Excel serial) to datetime
-    converted_numeric = pd.to_datetime("1899-12-30") + pd.to_timedelta(
-        numeric_part, unit="D"
+def column_overview(df: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Column Name": df.columns,
+            "Data Type": [str(dtype) for dtype in df.dtypes],
+            "Non-Null Count": df.notna().sum().to_numpy(),
+        }
     )
 
-    # Convert text (normal date strings) to datetime
-    converted_text = pd.to_datetime(text_part, errors="coerce")
 
-    # Combine both back into one column
-    df.loc[is_numeric, date_col] = converted_numeric
-    df.loc[~is_numeric, date_col] = converted_text
+def sorted_positions(df: pd.DataFrame, col_index: int, ascending: bool) -> np.ndarray:
+    """Row positions of `df` ordered by one column, blanks last."""
+    column = df.iloc[:, col_index].reset_index(drop=True)
+    order = column.sort_values(ascending=ascending, kind="stable", na_position="last")
+    return order.index.to_numpy()
 
-    # Final cleanup
-    df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
-    df = df.dropna(subset=[date_col])
 
-    return df
+def get_sorted_requests(col_index: Optional[int], ascending: bool):
+    """(request log, row order) for one sort, computed once per data version."""
+    if col_index is None:
+        return load_request_log_data.derive(
+            "rows", lambda df: (df, np.arange(len(df)))
+        )
+    return load_request_log_data.derive(
+        f"rows:{col_index}:{ascending}",
+        lambda df: (df, sorted_positions(df, col_index, ascending)),
+    )
 
 
+@st.cache_resource
+def get_figure_cache() -> FigureCache:
+    return FigureCache(st.secrets.get("FIGURE_CACHE_SIZE", DEFAULT_MAX_FIGURES))
+
+
+def cached_figure(chart_id: str, start_date, end_date, build, *state):
+    """
+    Figure for `chart_id` over the date range, built by `build()` only when the
+    data version, range or `state` (e.g. the grouping choice) is new.
+    """
+    key = (load_production_request_data.version, start_date, end_date, chart_id)
+    return get_figure_cache().get(key + state, build)
+
+
+on_rows_appended("production_request_data", patch_production_request_data)
+on_snapshot_reconciled(
+    "production_request_data",
+    load_production_request_data.invalidate,
+    range_key(
+        st.secrets["SPREADSHEET_PRODUCTION_REQUEST_FORM_STORED"],
+        "A:P",
+        columns=DASHBOARD_COLUMNS,
+    ),
+)
+on_snapshot_reconciled(
+    "request_log_data",
+    load_request_log_data.invalidate,
+    range_key(st.secrets["SPREADSHEET_PRODUCTION_REQUEST_FORM_STORED"], "A:P"),
+)
+on_snapshot_reconciled(
+    "dashboard_info_data",
+    load_production_info_data.invalidate,
+    range_key(
+        st.secrets["SPREADSHEET_PRODUCTION_REQUEST_FORM_READ"], "A:P", "dashboard"
+    ),
+)
+
+
+@register_page("production_dashboard", render="render_dashboard")
 class ProductionDashboard:
     """Class to handle production request dashboard visualizations."""
 
+    # View label -> method rendering it
+    VIEWS = {
+        "Overview": "render_overview",
+        "By Type": "render_by_type",
+        "Room/Building/Zone": "render_by_place",
+        "Trends": "render_trends",
+        "Heatmap": "render_heatmap",
+        "Retention": "render_retention",
+    }
+
     def __init__(self):
-        self.db = ProductionRequestFormDB(
-            range_name="A:P",
-            spreadsheet=st.secrets["SPREADSHEET_PRODUCTION_REQUEST_FORM_STORED"],
-        )
-        self.db_read = ProductionRequestFormDB(
-            range_name="A:P",
-            spreadsheet=st.secrets["SPREADSHEET_PRODUCTION_REQUEST_FORM_READ"],
-            sheet_name="dashboard",
-        )
-        self.df = load_production_request_data()
+        try:
+            self.df = load_production_request_data()
+        except Exception as e:
+            st.error(f"Failed to fetch data: {e}")
+            self.df = pd.DataFrame()
 
     def title(self, x):
         df = load_production_info_data()
@@ -91,8 +227,10 @@ class ProductionDashboard:
             return df
 
         # Convert date column to datetime safely
-        date_col = get_form_questions(df, 13)
-        if date_col in df.columns:
+        date_col = request_column(13)
+        if date_col in df.columns and not pd.api.types.is_datetime64_any_dtype(
+            df[date_col]
+        ):
             df[date_col] = pd.to_datetime(
                 df[date_col], format="%Y-%m-%d", errors="coerce"
             )
@@ -105,16 +243,13 @@ class ProductionDashboard:
             return
 
         df = self.df
-        name_col = get_form_questions(df, 0)
-        date_col = get_form_questions(df, 14)
+        name_col = request_column(0)
 
         total_requests = df.shape[0]
-        unique_users = df[name_col].nunique()
-
-        df = normalize_dates(df, date_col)
+        unique_users = df[name_col].nunique() if name_col in df.columns else "N/A"
 
         try:
-            busiest_date = df[date_col].value_counts().idxmax().strftime("%Y-%m-%d")
+            busiest_date = get_request_cube().totals.idxmax().strftime("%Y-%m-%d")
         except Exception:
             busiest_date = "N/A"
 
@@ -129,111 +264,82 @@ class ProductionDashboard:
         if self.df.empty:
             return
 
-        df = self.df.copy()
-        name_col = get_form_questions(df, 0)
-        type_col = get_form_questions(df, 1)
-        team_col = get_form_questions(df, 2)
-        room_col = get_form_questions(df, 6)
-        building_col = get_form_questions(df, 7)
-        zone_col = get_form_questions(df, 8)
-        date_col = get_form_questions(df, 14)
-
-        # Ensure datetime
-        # df = normalize_dates(df, date_col)
-
+        cube = get_request_cube()
+        if cube.empty:
+            return
         st.subheader("📅 Select Date Range")
 
+        first, last = cube.date_range()
         start_date, end_date = st.date_input(
             "Filter by date:",
-            value=[df[date_col].min(), df[date_col].max()],
-            min_value=df[date_col].min(),
-            max_value=df[date_col].max(),
+            value=[first, last],
+            min_value=first,
+            max_value=last,
         )
 
-        df = df[
-            (df[date_col].dt.date >= start_date) & (df[date_col].dt.date <= end_date)
-        ]
-
-        # ------------------ Tabs ------------------ #
-        tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(
-            [
-                "Overview",
-                "By Type",
-                "Room/Building/Zone",
-                "Trends",
-                "Heatmap",
-                "Retention",
-            ]
+        # ------------------ Views ------------------ #
+        # Only the selected view is computed and sent to the browser
+        view = option_menu(
+            menu_title=None,
+            options=list(self.VIEWS),
+            icons=["grid", "tags", "building", "graph-up", "fire", "arrow-repeat"],
+            orientation="horizontal",
+            key="dashboard_view",
         )
+        getattr(self, self.VIEWS[view])(cube, start_date, end_date)
 
-        # ------------------ Overview ------------------ #
-        with tab1:
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.subheader("👥 Requests by User")
-                user_counts = df[name_col].value_counts().reset_index(name="User")
-                st.bar_chart(user_counts.set_index("User"))
-                if st.checkbox("Show user data", key="user"):
-                    st.dataframe(user_counts)
-
-            with col2:
-                st.subheader("📅 Requests by Date")
-                date_counts = (
-                    df[date_col].value_counts().sort_index().reset_index(name="Date")
-                )
-                st.bar_chart(date_counts.set_index("Date"))
-                if st.checkbox("Show date data", key="date"):
-                    st.dataframe(date_counts)
-
-            with col3:
-                st.subheader("📊 Requests by Team")
-                team_counts = df[team_col].value_counts().reset_index(name="Team")
-                st.bar_chart(team_counts.set_index("Team"))
-                if st.checkbox("Show team data", key="team"):
-                    st.dataframe(team_counts)
-
-        # ------------------ Requests by Type ------------------ #
-        with tab2:
-            st.subheader("📍 Requests by Type")
-            type_counts = df[type_col].value_counts().reset_index(name="Type")
-            st.bar_chart(type_counts.set_index("Type"))
-            if st.checkbox("Show type data"):
-                st.dataframe(type_counts)
-
-        # ------------------ Flexible Grouping ------------------ #
-        with tab3:
-            st.subheader("🏢 Requests by Room / Building / Zone")
-            group_choice = st.radio(
-                "Group requests by:",
-                ["Room", "Building", "Zone", "All Available"],
-                horizontal=True,
-            )
-
-            if group_choice == "Room":
-                df_group = df.groupby(room_col).size().reset_index(name="Count")
-                fig_group = px.bar(
-                    df_group, x=room_col, y="Count", title="Requests by Room"
-                )
-
-            elif group_choice == "Building":
-                df_group = df.groupby(building_col).size().reset_index(name="Count")
-                fig_group = px.bar(
-                    df_group, x=building_col, y="Count", title="Requests by Building"
-                )
+    def render_overview(self, cube: RequestCube, start_date, end_date):
+        """Requests per user, date and team."""
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.subheader("👥 Requests by User")
+            user_counts = cube.by("user", start_date, end_date).reset_index(name="User")
+            st.bar_chart(user_counts.set_index("User"))
+            if st.checkbox("Show user data", key="user"):
+                st.dataframe(user_counts)
+
+        with col2:
+            st.subheader("📅 Requests by Date")
+            date_counts = cube.over_time(start_date, end_date).reset_index(name="Date")
+            st.bar_chart(date_counts.set_index("Date"))
+            if st.checkbox("Show date data", key="date"):
+                st.dataframe(date_counts)
+
+        with col3:
+            st.subheader("📊 Requests by Team")
+            team_counts = cube.by("team", start_date, end_date).reset_index(name="Team")
+            st.bar_chart(team_counts.set_index("Team"))
+            if st.checkbox("Show team data", key="team"):
+                st.dataframe(team_counts)
+
+    def render_by_type(self, cube: RequestCube, start_date, end_date):
+        """Requests per type."""
+        st.subheader("📍 Requests by Type")
+        type_counts = cube.by("type", start_date, end_date).reset_index(name="Type")
+        st.bar_chart(type_counts.set_index("Type"))
+        if st.checkbox("Show type data"):
+            st.dataframe(type_counts)
+
+    def render_by_place(self, cube: RequestCube, start_date, end_date):
+        """Requests per room, building, zone or all three."""
+        st.subheader("🏢 Requests by Room / Building / Zone")
+        group_choice = st.radio(
+            "Group requests by:",
+            ["Room", "Building", "Zone", "All Available"],
+            horizontal=True,
+        )
 
-            elif group_choice == "Zone":
-                df_group = df.groupby(zone_col).size().reset_index(name="Count")
-                fig_group = px.bar(
-                    df_group, x=zone_col, y="Count", title="Requests by Zone"
-                )
+        room_col, building_col, zone_col = cube.columns["place"]
+        dimension = "place" if group_choice == "All Available" else group_choice.lower()
+        df_group = (
+            cube.by(dimension, start_date, end_date)
+            .sort_index()
+            .reset_index(name="Count")
+        )
 
-            else:  # All Available
-                df_group = (
-                    df.groupby([room_col, building_col, zone_col])
-                    .size()
-                    .reset_index(name="Count")
-                )
-                fig_group = px.bar(
+        def build():
+            if dimension == "place":
+                return px.bar(
                     df_group,
                     x=room_col,
                     y="Count",
@@ -242,81 +348,116 @@ class ProductionDashboard:
                     barmode="group",
                     title="Requests by Room / Building / Zone",
                 )
-
-            st.plotly_chart(fig_group, use_container_width=True)
-            if st.checkbox("Show grouped data"):
-                st.dataframe(df_group)
-
-        # ------------------ Trends ------------------ #
-        with tab4:
-            st.subheader("📆 Requests Over Time")
-            df_time = df.groupby(date_col).size().reset_index(name="Count")
-            fig_time = px.line(
-                df_time, x=date_col, y="Count", markers=True, title="Requests Over Time"
+            return px.bar(
+                df_group,
+                x=df_group.columns[0],
+                y="Count",
+                title=f"Requests by {group_choice}",
             )
-            st.plotly_chart(fig_time, use_container_width=True)
 
-            # Cumulative
-            df_time["Cumulative"] = df_time["Count"].cumsum()
-            fig_cum = px.line(
+        fig_group = cached_figure("group", start_date, end_date, build, dimension)
+        st.plotly_chart(fig_group, use_container_width=True)
+        if st.checkbox("Show grouped data"):
+            st.dataframe(df_group)
+
+    def render_trends(self, cube: RequestCube, start_date, end_date):
+        """Daily, cumulative and 7-day average requests."""
+        st.subheader("📆 Requests Over Time")
+        date_col = cube.date_col
+        df_time = cube.over_time(start_date, end_date).reset_index(name="Count")
+        df_time["Cumulative"] = df_time["Count"].cumsum()
+        df_time["7d_avg"] = df_time["Count"].rolling(7, min_periods=1).mean()
+
+        fig_time = cached_figure(
+            "time",
+            start_date,
+            end_date,
+            lambda: px.line(
+                df_time, x=date_col, y="Count", markers=True, title="Requests Over Time"
+            ),
+        )
+        st.plotly_chart(fig_time, use_container_width=True)
+
+        # Cumulative
+        fig_cum = cached_figure(
+            "cumulative",
+            start_date,
+            end_date,
+            lambda: px.line(
                 df_time,
                 x=date_col,
                 y="Cumulative",
                 title="Cumulative Requests Over Time",
-            )
-            st.plotly_chart(fig_cum, use_container_width=True)
-
-            # Moving average
-            df_time["7d_avg"] = df_time["Count"].rolling(7, min_periods=1).mean()
-            fig_trend = px.line(
+            ),
+        )
+        st.plotly_chart(fig_cum, use_container_width=True)
+
+        # Moving average
+        fig_trend = cached_figure(
+            "trend",
+            start_date,
+            end_date,
+            lambda: px.line(
                 df_time,
                 x=date_col,
                 y=["Count", "7d_avg"],
                 labels={"value": "Requests", "variable": "Metric"},
                 title="Requests with 7-day Moving Average",
-            )
-            st.plotly_chart(fig_trend, use_container_width=True)
-
-            if st.checkbox("Show time data"):
-                st.dataframe(df_time)
-
-        # ------------------ Heatmap ------------------ #
-        with tab5:
-            st.subheader("🔥 Requests by Day of Week & Hour")
-            if pd.api.types.is_datetime64_any_dtype(df[date_col]):
-                df["weekday"] = df[date_col].dt.day_name()
-                df["hour"] = df[date_col].dt.hour
-                heatmap = (
-                    df.groupby(["weekday", "hour"]).size().reset_index(name="Count")
-                )
-                fig_heatmap = px.density_heatmap(
-                    heatmap,
-                    x="hour",
-                    y="weekday",
-                    z="Count",
-                    title="Requests by Day of Week & Hour",
-                    nbinsx=24,
-                    color_continuous_scale="Viridis",
-                )
-                st.plotly_chart(fig_heatmap, use_container_width=True)
-                if st.checkbox("Show heatmap data"):
-                    st.dataframe(heatmap)
-
-        # ------------------ Retention ------------------ #
-        with tab6:
-            st.subheader("🔁 User Retention")
-            requester_freq = df[name_col].value_counts()
-            one_time = (requester_freq == 1).sum()
-            repeat = (requester_freq > 1).sum()
-
-            st.write(f"One-time requesters: {one_time}")
-            st.write(f"Repeat requesters: {repeat}")
-            fig_ret = px.pie(
+            ),
+        )
+        st.plotly_chart(fig_trend, use_container_width=True)
+
+        if st.checkbox("Show time data"):
+            st.dataframe(df_time)
+
+    def render_heatmap(self, cube: RequestCube, start_date, end_date):
+        """Requests by day of week and hour."""
+        st.subheader("🔥 Requests by Day of Week & Hour")
+        per_date = cube.over_time(start_date, end_date)
+        heatmap = (
+            per_date.groupby([per_date.index.day_name(), per_date.index.hour])
+            .sum()
+            .rename_axis(["weekday", "hour"])
+            .reset_index(name="Count")
+        )
+        fig_heatmap = cached_figure(
+            "heatmap",
+            start_date,
+            end_date,
+            lambda: px.density_heatmap(
+                heatmap,
+                x="hour",
+                y="weekday",
+                z="Count",
+                title="Requests by Day of Week & Hour",
+                nbinsx=24,
+                color_continuous_scale="Viridis",
+            ),
+        )
+        st.plotly_chart(fig_heatmap, use_container_width=True)
+        if st.checkbox("Show heatmap data"):
+            st.dataframe(heatmap)
+
+    def render_retention(self, cube: RequestCube, start_date, end_date):
+        """One-time versus repeat requesters."""
+        st.subheader("🔁 User Retention")
+        requester_freq = cube.by("user", start_date, end_date)
+        one_time = (requester_freq == 1).sum()
+        repeat = (requester_freq > 1).sum()
+
+        st.write(f"One-time requesters: {one_time}")
+        st.write(f"Repeat requesters: {repeat}")
+        fig_ret = cached_figure(
+            "retention",
+            start_date,
+            end_date,
+            lambda: px.pie(
                 names=["One-time", "Repeat"],
                 values=[one_time, repeat],
                 title="User Retention",
-            )
-            st.plotly_chart(fig_ret, use_container_width=True)
+            ),
+        )
+        st.plotly_chart(fig_ret, use_container_width=True)
 
     def render_data_table(self):
         """Display dataframe with interactive exploration options."""
@@ -325,6 +466,10 @@ class ProductionDashboard:
             return
 
         with st.expander("🔍 Explore Data"):
+            # Expander bodies run even when collapsed: the full-width log is
+            # only fetched once the user asks for it
+            if not st.checkbox("Show all columns", key="explore_data"):
+                return
             view_option = st.radio(
                 "Choose view:",
                 ["Preview", "Full Data", "Column Overview"],
@@ -332,24 +477,71 @@ class ProductionDashboard:
             )
 
             if view_option == "Preview":
-                st.dataframe(self.df.head(10), use_container_width=True)
-                st.caption(f"Showing first 10 of {len(self.df)} rows.")
+                log = load_request_log_data()
+                st.dataframe(log.head(10), use_container_width=True)
+                st.caption(f"Showing first 10 of {len(log)} rows.")
 
             elif view_option == "Full Data":
-                st.dataframe(self.df, use_container_width=True)
+                self.render_full_data()
 
             elif view_option == "Column Overview":
-                st.table(
-                    pd.DataFrame(
-                        {
-                            "Column Name": self.df.columns,
-                            "Data Type": [str(dtype) for dtype in self.df.dtypes],
-                            "Non-Null Count": [
-                                self.df[col].notnull().sum() for col in self.df.columns
-                            ],
-                        }
-                    )
+                overview = load_request_log_data.derive(
+                    "column_overview", column_overview
                 )
+                st.table(overview)
+
+    def render_full_data(self):
+        """
+        Page through the whole log. Sorting, filtering and slicing happen here,
+        so only the visible page is sent to the browser.
+        """
+        columns = load_request_log_data().columns
+        col1, col2, col3 = st.columns([2, 1, 1])
+        sort_index = col1.selectbox(
+            "Sort by",
+            [None, *range(len(columns))],
+            format_func=lambda i: "Sheet order" if i is None else str(columns[i]),
+            key="full_data_sort",
+        )
+        direction = col2.radio(
+            "Order", ["Ascending", "Descending"], horizontal=True, key="full_data_order"
+        )
+        page_size = col3.selectbox(
+            "Rows per page", [25, 50, 100, 500], key="full_data_page_size"
+        )
+
+        col1, col2 = st.columns([1, 2])
+        filter_index = col1.selectbox(
+            "Filter column",
+            [None, *range(len(columns))],
+            format_func=lambda i: "No filter" if i is None else str(columns[i]),
+            key="full_data_filter_column",
+        )
+        filter_text = col2.text_input(
+            "Contains", key="full_data_filter", disabled=filter_index is None
+        )
+
+        df, order = get_sorted_requests(sort_index, direction == "Ascending")
+        if filter_index is not None and filter_text:
+            matches = (
+                df.iloc[:, filter_index]
+                .astype("string")
+                .str.contains(filter_text, case=False, regex=False, na=False)
+                .to_numpy()
+            )
+            order = order[matches[order]]
+
+        pages = max(1, math.ceil(len(order) / page_size))
+        page = st.number_input(
+            "Page", min_value=1, max_value=pages, value=1, key="full_data_page"
+        )
+        start = (page - 1) * page_size
+        visible = df.iloc[order[start : start + page_size]]
+        st.dataframe(visible, use_container_width=True)
+        st.caption(
+            f"Rows {min(start + 1, len(order))}-{min(start + page_size, len(order))}"
+            f" of {len(order)} (page {page} of {pages})."
+        )
 
     def render_dashboard(self):
         """Render full dashboard with metrics, charts, and data table."""
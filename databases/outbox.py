@@ -0,0 +1,242 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.request_scheduler import background_priority
+
+# Rows waiting to be appended to a sheet. Submissions land here first (a local
+# SQLite insert) and a background flusher sends them in multi-row appends.
+DEFAULT_OUTBOX_PATH = os.path.join(".cache", "outbox.sqlite3")
+
+# Most rows sent in a single values.append call
+BATCH_SIZE = 50
+# Time a flush waits after being woken so a burst of submissions shares one call
+COALESCE_DELAY = 1.0
+MAX_BACKOFF = 300
+# Sends after which a row is moved to the dead letter table
+MAX_ATTEMPTS = 8
+
+logger = logging.getLogger(__name__)
+
+
+class Outbox:
+    """Durable FIFO of sheet rows, safe to use from several threads."""
+
+    def __init__(self, path: str = DEFAULT_OUTBOX_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    sheet_id TEXT NOT NULL,
+                    range_name TEXT NOT NULL,
+                    row TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+            # Rows given up on: retried MAX_ATTEMPTS times or rejected outright
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS dead_letter (
+                    id INTEGER PRIMARY KEY,
+                    sheet_id TEXT NOT NULL,
+                    range_name TEXT NOT NULL,
+                    row TEXT NOT NULL,
+                    attempts INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    failed_at REAL NOT NULL,
+                    error TEXT
+                )
+                """
+            )
+
+    def put(self, sheet_id: str, range_name: str, row: list) -> int:
+        """Queue one row; returns its outbox id once it is on disk."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO outbox (sheet_id, range_name, row, created_at)"
+                " VALUES (?, ?, ?, ?)",
+                (sheet_id, range_name, json.dumps(row, default=str), time.time()),
+            )
+            return cursor.lastrowid
+
+    def pending(self, limit: int = 500) -> List[Tuple[int, str, str, list, int]]:
+        """Oldest queued rows as (id, sheet_id, range_name, row, attempts)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, sheet_id, range_name, row, attempts FROM outbox"
+                " ORDER BY id LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [
+            (id_, sheet_id, range_name, json.loads(row), attempts)
+            for id_, sheet_id, range_name, row, attempts in rows
+        ]
+
+    def done(self, ids: List[int]):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM outbox WHERE id = ?", [(i,) for i in ids]
+            )
+
+    def failed(self, ids: List[int]):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE outbox SET attempts = attempts + 1 WHERE id = ?",
+                [(i,) for i in ids],
+            )
+
+    def bury(self, ids: List[int], error: str = ""):
+        """Move rows to the dead letter table so later rows can go out."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO dead_letter (id, sheet_id, range_name, row, attempts,"
+                " created_at, failed_at, error)"
+                " SELECT id, sheet_id, range_name, row, attempts, created_at, ?, ?"
+                " FROM outbox WHERE id = ?",
+                [(time.time(), error, i) for i in ids],
+            )
+            self._conn.executemany(
+                "DELETE FROM outbox WHERE id = ?", [(i,) for i in ids]
+            )
+
+    def dead_letters(
+        self, range_name: Optional[str] = None, since: Optional[float] = None
+    ) -> List[dict]:
+        """
+        Rows given up on, oldest first; optionally only those of one range and
+        those buried after `since` (a time.time() timestamp).
+        """
+        query = "SELECT id, sheet_id, range_name, row, attempts, failed_at, error"
+        query += " FROM dead_letter WHERE 1 = 1"
+        params: tuple = ()
+        if range_name is not None:
+            query += " AND range_name = ?"
+            params += (range_name,)
+        if since is not None:
+            query += " AND failed_at > ?"
+            params += (since,)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY id", params).fetchall()
+        keys = ("id", "sheet_id", "range_name", "row", "attempts", "failed_at", "error")
+        return [
+            {**dict(zip(keys, row)), "row": json.loads(row[3])} for row in rows
+        ]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+
+class OutboxFlusher:
+    """
+    Background thread draining an Outbox through `send(sheet_id, range_name, rows)`,
+    which returns True once the rows are in the sheet. Rows for the same range
+    go out in order, BATCH_SIZE at a time; failed batches are retried with
+    exponential backoff. Delivery is at-least-once: a crash between the append
+    and the delete re-sends that batch.
+
+    A batch rejected for good (`is_permanent(error)`) or failing MAX_ATTEMPTS
+    times goes to the dead letter table, so it stops holding up its range.
+
+    A failed append may still have landed (a 5xx or a timeout after the write).
+    Before a batch is sent again, `already_sent(sheet_id, range_name, rows)`
+    says which of its rows are in the sheet already; those are not re-sent.
+    """
+
+    def __init__(
+        self,
+        outbox: Outbox,
+        send: Callable[[str, str, List[list]], bool],
+        is_permanent: Callable[[Exception], bool] = lambda error: False,
+        already_sent: Optional[Callable[[str, str, List[list]], List[bool]]] = None,
+    ):
+        self.outbox = outbox
+        self.send = send
+        self.is_permanent = is_permanent
+        self.already_sent = already_sent
+        self._wake = threading.Event()
+        self._failures = 0
+        self._thread = threading.Thread(
+            target=self._run, name="outbox-flusher", daemon=True
+        )
+        self._thread.start()
+
+    def wake(self):
+        """Ask for a flush soon (after a short coalescing delay)."""
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            if self._failures:
+                # Sheets is failing: new submissions queue up but do not cut the wait short
+                time.sleep(min(2**self._failures, MAX_BACKOFF))
+            elif self._wake.wait(timeout=30):
+                time.sleep(COALESCE_DELAY)
+            self._wake.clear()
+            # Nobody is waiting on the flush: let interactive reads go first
+            with background_priority():
+                ok = self.flush()
+            self._failures = 0 if ok else self._failures + 1
+
+    def flush(self) -> bool:
+        """Send everything queued; returns False if any batch failed."""
+        ok = True
+        groups: Dict[Tuple[str, str], list] = {}
+        for item in self.outbox.pending():
+            groups.setdefault((item[1], item[2]), []).append(item)
+
+        for (sheet_id, range_name), group in groups.items():
+            for start in range(0, len(group), BATCH_SIZE):
+                batch = group[start : start + BATCH_SIZE]
+                if self.already_sent and any(item[4] for item in batch):
+                    try:
+                        landed = self.already_sent(
+                            sheet_id, range_name, [item[3] for item in batch]
+                        )
+                    except Exception:
+                        ok = False
+                        break
+                    self.outbox.done([i[0] for i, sent in zip(batch, landed) if sent])
+                    batch = [i for i, sent in zip(batch, landed) if not sent]
+                    if not batch:
+                        continue
+                ids = [item[0] for item in batch]
+                error = None
+                try:
+                    sent = self.send(sheet_id, range_name, [item[3] for item in batch])
+                except Exception as e:
+                    sent, error = False, e
+                if sent:
+                    self.outbox.done(ids)
+                    continue
+
+                self.outbox.failed(ids)
+                attempts = max(item[4] for item in batch) + 1
+                if (error is not None and self.is_permanent(error)) or (
+                    attempts >= MAX_ATTEMPTS
+                ):
+                    self.outbox.bury(ids, repr(error))
+                    logger.error(
+                        "Outbox gave up on %d row(s) for %s %s after %d attempt(s): %r",
+                        len(ids),
+                        sheet_id,
+                        range_name,
+                        attempts,
+                        error,
+                    )
+                    continue
+                ok = False
+                # Keep order within the range: later rows wait for this batch
+                break
+        return ok
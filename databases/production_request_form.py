@@ -1,38 +1,499 @@
+import logging
+import re
+import threading
+import time
+import uuid
+import weakref
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
 import pandas as pd
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
+from databases.outbox import DEFAULT_OUTBOX_PATH, Outbox, OutboxFlusher
+from databases.schema import ColumnSpec, apply_schema, concat_typed, project_schema
+from databases.snapshots import (
+    load_snapshot,
+    notify_reconciled,
+    save_snapshot,
+    snapshot_version,
+)
+from utils.api_retry import is_rejected
 from utils.google_sheets_client import GoogleSheetsClient
+from utils.request_scheduler import background_priority
 
+# A1 ranges ("sheet!A:O") declared per spreadsheet. Every read of a declared
+# range fetches all of its spreadsheet's declared ranges with one batchGet, so
+# a rerun costs one round trip per spreadsheet instead of one per range. Header
+# rows ("sheet!A1:O1") are batched separately so building a DB object never
+# downloads whole columns.
+_declared_ranges: Dict[str, Set[str]] = defaultdict(set)
+_declared_headers: Dict[str, Set[str]] = defaultdict(set)
+_declared_lock = threading.Lock()
 
-@st.cache_data(ttl=3600)  # cache for 1 hour
-def fetch_headers(sheet_id, sheet_name, ranges, value_0: bool = True):
-    """Fetch headers from the first row of the sheet."""
-    google_client = GoogleSheetsClient()
+# Header rows seen in full data fetches, keyed by (sheet_id, "sheet!A:O")
+_known_headers: Dict[Tuple[str, str], list] = {}
+
+# (sheet_id, sheet_name, range) keys whose on-disk snapshot has already been
+# served in this process; later reads always go to the remote sheet.
+_snapshots_served: Set[Tuple[str, str, str]] = set()
+_snapshots_lock = threading.Lock()
+
+# Last frame built per (sheet_id, sheet_name, range) with the Drive version it
+# was built from, so an unchanged spreadsheet hands back the very same frame.
+_frames: Dict[Tuple[str, str, str], Tuple[str, pd.DataFrame]] = {}
+# Last values fetched per sheet_id and A1 range, served while the API is failing.
+# One copy per range: each successful batch replaces the ranges it fetched.
+_last_good_values: Dict[str, Dict[str, list]] = defaultdict(dict)
+# Last header row read per (sheet_id, "sheet!A:O"), served likewise
+_last_good_headers: Dict[Tuple[str, str], list] = {}
+# Last frame written to the snapshot per key, to skip rewriting unchanged data.
+# Held weakly: it must not keep an otherwise dropped frame alive.
+_snapshot_frames: "weakref.WeakValueDictionary[Tuple[str, str, str], pd.DataFrame]" = (
+    weakref.WeakValueDictionary()
+)
+
+logger = logging.getLogger(__name__)
+
+_COLUMN_RANGE = re.compile(r"^([A-Za-z]+)\d*:([A-Za-z]+)\d*$")
+_UPDATED_RANGE = re.compile(r"^(?:'?(.+?)'?!)?[A-Za-z]+(\d+)(?::[A-Za-z]+(\d+))?$")
+
+# Callbacks told about rows appended through ProductionRequestFormDB, keyed by
+# name so Streamlit reruns replace rather than add. Each receives
+# (sheet_id, sheet_name, first_row, rows) so cached copies can be patched in place.
+_append_listeners: Dict[str, Callable[[str, str, int, List[list]], None]] = {}
+_append_lock = threading.Lock()
+
+
+def _report(level: str, message: str):
+    """
+    Show `message` with st.error / st.warning when running a script; log it on
+    background threads (refreshes, reconciles), where Streamlit calls only
+    produce missing ScriptRunContext warnings.
+    """
+    if get_script_run_ctx(suppress_warning=True) is not None:
+        getattr(st, level)(message)
+    else:
+        logger.log(logging.ERROR if level == "error" else logging.WARNING, message)
+
+
+def declare_range(
+    spreadsheet: str,
+    range_name: str,
+    sheet_name: str = "sheet1",
+    columns: Optional[Sequence[int]] = None,
+):
+    """
+    Register a range up front so it is fetched in the same batch as the others.
+    With `columns`, only those columns of the range are declared (see
+    ProductionRequestFormDB).
+    """
+    sheet_id = GoogleSheetsClient.extract_spreadsheet_id(spreadsheet)
+    with _declared_lock:
+        for part in projected_ranges(range_name, columns):
+            _declared_ranges[sheet_id].add(f"{sheet_name}!{part}")
+
+
+def range_key(
+    spreadsheet: str,
+    range_name: str,
+    sheet_name: str = "sheet1",
+    columns: Optional[Sequence[int]] = None,
+) -> Tuple[str, str, str]:
+    """
+    (sheet_id, sheet_name, ranges) key of a range's snapshot and memoized frame,
+    as ProductionRequestFormDB(range_name, spreadsheet, sheet_name, columns=...)
+    keys them.
+    """
+    sheet_id = GoogleSheetsClient.extract_spreadsheet_id(spreadsheet)
+    columns = tuple(sorted(set(columns))) if columns else None
+    return sheet_id, sheet_name, ",".join(projected_ranges(range_name, columns))
+
+
+def _declared_batch(
+    sheet_id: str, a1_ranges, headers: bool = False
+) -> Tuple[str, ...]:
+    """
+    The batch to fetch `a1_ranges` in. Header rows are small, so any header row
+    read joins its spreadsheet's batch. Values ranges share the batch only if
+    they were declared with declare_range; others (e.g. read on demand) are
+    fetched on their own, so they never add to every later read.
+    """
+    if isinstance(a1_ranges, str):
+        a1_ranges = [a1_ranges]
+    with _declared_lock:
+        if headers:
+            _declared_headers[sheet_id].update(a1_ranges)
+            return tuple(sorted(_declared_headers[sheet_id]))
+        declared = _declared_ranges[sheet_id]
+        if declared.issuperset(a1_ranges):
+            return tuple(sorted(declared))
+    return tuple(sorted(set(a1_ranges)))
+
+
+def column_bounds(ranges: str) -> Optional[Tuple[str, str]]:
+    """Return the first and last column letters of a range such as "A:O"."""
+    match = _COLUMN_RANGE.match(ranges)
+    if not match:
+        return None
+    return match.group(1), match.group(2)
+
+
+def column_number(letters: str) -> int:
+    """0-based position of a column: "A" -> 0, "P" -> 15, "AA" -> 26."""
+    number = 0
+    for letter in letters.upper():
+        number = number * 26 + ord(letter) - ord("A") + 1
+    return number - 1
+
+
+def column_letters(number: int) -> str:
+    """Inverse of column_number: 0 -> "A", 26 -> "AA"."""
+    letters = ""
+    number += 1
+    while number:
+        number, remainder = divmod(number - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def projected_ranges(ranges: str, columns: Optional[Sequence[int]] = None) -> List[str]:
+    """
+    Split a column range into the contiguous runs holding `columns` (positions
+    within the range): "A:P" with (0, 1, 2, 13, 14) gives ["A:C", "N:O"].
+    """
+    bounds = column_bounds(ranges)
+    if not columns or bounds is None:
+        return [ranges]
+    first = column_number(bounds[0])
+    runs: List[List[int]] = []
+    for position in sorted(set(columns)):
+        if runs and position == runs[-1][1] + 1:
+            runs[-1][1] = position
+        else:
+            runs.append([position, position])
+    return [
+        f"{column_letters(first + start)}:{column_letters(first + end)}"
+        for start, end in runs
+    ]
+
+
+def join_blocks(blocks: List[list], widths: List[int]) -> List[list]:
+    """
+    Put the rows of several column ranges fetched side by side back together.
+    The API trims empty trailing cells and rows per range, so short rows and
+    missing rows are padded with None.
+    """
+    if len(blocks) == 1:
+        return blocks[0]
+    n_rows = max((len(block) for block in blocks), default=0)
+    rows = []
+    for i in range(n_rows):
+        row = []
+        for block, width in zip(blocks, widths):
+            cells = block[i][:width] if i < len(block) else []
+            row.extend(cells)
+            row.extend([None] * (width - len(cells)))
+        rows.append(row)
+    return rows
+
+
+def header_range(ranges: str) -> str:
+    """Turn a column range such as "A:O" into its first-row range "A1:O1"."""
+    bounds = column_bounds(ranges)
+    if bounds is None:
+        return ranges
+    return f"{bounds[0]}1:{bounds[1]}1"
+
+
+def parse_updated_range(updated_range: str) -> Optional[Tuple[str, int, int]]:
+    """Split an API range like "'Sheet 1'!A12:O13" into (sheet name, 12, 13)."""
+    match = _UPDATED_RANGE.match(updated_range or "")
+    if not match:
+        return None
+    sheet_name, first_row, last_row = match.groups()
+    return sheet_name or "", int(first_row), int(last_row or first_row)
+
+
+def on_rows_appended(name: str, callback: Callable[[str, str, int, List[list]], None]):
+    """Register a callback run after rows are appended to any sheet."""
+    with _append_lock:
+        _append_listeners[name] = callback
+
+
+def notify_appended(sheet_id: str, result: Optional[dict], rows: List[list]):
+    """Forward a successful append response to the registered callbacks."""
+    updates = (result or {}).get("updates") or {}
+    parsed = parse_updated_range(updates.get("updatedRange"))
+    if parsed is None:
+        return
+    sheet_name, first_row, _ = parsed
+    # Prefer the rows as the sheet rendered them (dates, numbers) over what we sent
+    rows = (updates.get("updatedData") or {}).get("values") or rows
+
+    with _append_lock:
+        callbacks = list(_append_listeners.values())
+    for callback in callbacks:
+        try:
+            callback(sheet_id, sheet_name, first_row, rows)
+        except Exception:
+            pass
+
+
+def build_frame(headers: list, data_rows: list) -> pd.DataFrame:
+    """
+    Build a DataFrame from raw sheet rows, padding short rows with None and
+    truncating rows longer than the header.
+
+    Rows are copied straight into one preallocated object array, a group of
+    equal-length rows at a time, so no row is padded or copied as a list.
+    """
+    width = len(headers)
+    n_rows = len(data_rows)
+    if not n_rows:
+        return pd.DataFrame(columns=headers)
+
+    lengths = np.fromiter(map(len, data_rows), dtype=np.intp, count=n_rows)
+    values = np.full((n_rows, width), None, dtype=object)
+    for length in np.unique(lengths):
+        length = int(length)
+        if length == 0:
+            continue  # completely empty rows stay all None
+        kept = min(length, width)
+        if length == lengths[0] and (lengths == length).all():
+            # Every row has the same shape (the common case): one bulk copy
+            block = np.empty((n_rows, length), dtype=object)
+            block[:] = data_rows
+            if length == width:
+                values = block
+            else:
+                values[:, :kept] = block[:, :kept]
+            break
+        rows_at = np.flatnonzero(lengths == length)
+        block = np.empty((len(rows_at), length), dtype=object)
+        block[:] = [data_rows[i] for i in rows_at]
+        values[rows_at, :kept] = block[:, :kept]
+
+    return pd.DataFrame(values, columns=headers, copy=False)
+
+
+def frame_memory(df: pd.DataFrame) -> int:
+    """Bytes held by the frame, including the Python strings in object columns."""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+@st.cache_data(ttl=60)
+def fetch_file_version(sheet_id) -> Optional[str]:
+    """Drive version of the spreadsheet, or None if it cannot be read."""
     try:
-        sheet_values = (
-            google_client.sheets_service.spreadsheets()
-            .values()
-            .get(spreadsheetId=sheet_id, range=f"{sheet_name}!{ranges}")
-            .execute()
-        )
-        if value_0:
-            return sheet_values.get("values", [[]])[0]
+        return get_google_client().get_file_version(sheet_id)
+    except Exception:
+        return None
+
+
+def _frame_version(key: Tuple[str, str, str], df: pd.DataFrame) -> Optional[str]:
+    # Drive version `df` was built from, if it is the frame memoized for `key`
+    cached = _frames.get(key)
+    return cached[0] if cached is not None and cached[1] is df else None
+
+
+@st.cache_data(ttl=600)
+def fetch_sheet_metadata(sheet_id) -> dict:
+    """Titles, ids and grid sizes of the spreadsheet's sheets, shared process-wide."""
+    return get_google_client().get_metadata(sheet_id)
+
+
+def _batch_get(sheet_id, ranges: Tuple[str, ...]) -> Dict[str, list]:
+    google_client = get_google_client()
+    value_ranges = google_client.batch_get_values(sheet_id, list(ranges))
+    return {
+        a1_range: value_range.get("values", [])
+        for a1_range, value_range in zip(ranges, value_ranges)
+    }
+
+
+# Used when the file version is unknown. Kept shorter than the shared datasets'
+# TTLs so their background refreshes see new data.
+@st.cache_data(ttl=300)
+def _fetch_batch_recent(sheet_id, ranges: Tuple[str, ...]) -> Dict[str, list]:
+    return _batch_get(sheet_id, ranges)
+
+
+# Keyed by the Drive version, so entries stay valid until the file changes. Each
+# change adds a key, so old versions are aged out rather than kept for good.
+@st.cache_data(ttl=3600, max_entries=8)
+def _fetch_batch_at_version(sheet_id, ranges: Tuple[str, ...], version: str):
+    return _batch_get(sheet_id, ranges)
+
+
+def fetch_batch(sheet_id, ranges: Tuple[str, ...]) -> Dict[str, list]:
+    """
+    Fetch several ranges of one spreadsheet with a single batchGet. Values are
+    only downloaded again once the spreadsheet's Drive version has changed.
+    If the API fails (after the client's retries) the last values fetched are
+    returned instead; the error is raised only when there are none.
+    """
+    try:
+        version = fetch_file_version(sheet_id)
+        if version:
+            values = _fetch_batch_at_version(sheet_id, ranges, version)
         else:
-            return sheet_values.get("values", [])
+            values = _fetch_batch_recent(sheet_id, ranges)
     except Exception:
-        # Silently fail and return empty list
-        return []
-    
-@st.cache_data(ttl=3600)  # cache for 1 hour
+        last_good = _last_good_values[sheet_id]
+        if not last_good.keys() >= set(ranges):
+            raise
+        return {a1_range: last_good[a1_range] for a1_range in ranges}
+    _last_good_values[sheet_id].update(values)
+    return values
+
+
+def fetch_headers(sheet_id, sheet_name, ranges, value_0: bool = True):
+    """
+    Fetch headers from the first row of the sheet, or with `value_0=False` all
+    values of the range. When the sheet cannot be read the last header row read
+    for the range is served; without one the error is raised, like a failed
+    values read, rather than handing back an empty header row.
+    """
+    a1_range = f"{sheet_name}!{ranges}"
+    if value_0:
+        # Reuse the header row of an already fetched range, else read row 1 only
+        known = _known_headers.get((sheet_id, a1_range))
+        if known is not None:
+            return known
+        first_row = f"{sheet_name}!{header_range(ranges)}"
+        try:
+            batch = _declared_batch(sheet_id, first_row, headers=True)
+            values = fetch_batch(sheet_id, batch).get(first_row, [])
+        except Exception:
+            last_good = _last_good_headers.get((sheet_id, a1_range))
+            if last_good is None:
+                raise
+            return last_good
+        headers = values[0] if values else []
+        _last_good_headers[(sheet_id, a1_range)] = headers
+        return headers
+
+    return fetch_column_ranges(sheet_id, sheet_name, [ranges])[0]
+
+
+def fetch_column_ranges(sheet_id, sheet_name, parts: Sequence[str]) -> List[list]:
+    """Values of several ranges of one sheet, fetched together in its declared batch."""
+    a1_ranges = [f"{sheet_name}!{part}" for part in parts]
+    sheet_values = fetch_batch(sheet_id, _declared_batch(sheet_id, a1_ranges))
+    for fetched_range, fetched in sheet_values.items():
+        if fetched:
+            _known_headers[(sheet_id, fetched_range)] = fetched[0]
+    return [sheet_values.get(a1_range, []) for a1_range in a1_ranges]
+
+@st.cache_resource  # one live client shared by every session and thread
 def get_google_client():
     return GoogleSheetsClient()
 
+# Column of the request rows that holds each submission's outbox key. It lies
+# right of every range the app reads, so the key is never taken for data.
+SUBMISSION_KEY_COLUMN = "Z"
+
+
+def split_range(a1_range: str) -> Tuple[Optional[str], str]:
+    """("sheet1!A:O") -> ("sheet1", "A:O"); the sheet is None when not given."""
+    sheet_name, separator, cells = a1_range.rpartition("!")
+    return (sheet_name if separator else None), cells
+
+
+def key_column(range_name: str) -> Optional[str]:
+    """
+    Column where rows appended to `range_name` carry their submission key, so
+    a retried append can tell whether an earlier attempt already landed. None
+    when the range reaches SUBMISSION_KEY_COLUMN itself.
+    """
+    bounds = column_bounds(split_range(range_name)[1])
+    if bounds is None or column_number(bounds[1]) >= column_number(
+        SUBMISSION_KEY_COLUMN
+    ):
+        return None
+    return SUBMISSION_KEY_COLUMN
+
+
+def _append_range(range_name: str) -> str:
+    # Wide enough to include the submission key column
+    sheet_name, cells = split_range(range_name)
+    bounds = column_bounds(cells)
+    column = key_column(range_name)
+    if column is None:
+        return range_name
+    prefix = f"{sheet_name}!" if sheet_name else ""
+    return f"{prefix}{bounds[0]}:{column}"
+
+
+def _sent_keys(sheet_id: str, range_name: str, rows: List[list]) -> List[bool]:
+    """Which queued rows are already in the sheet, found by their submission key."""
+    column = key_column(range_name)
+    if column is None:
+        return [False] * len(rows)
+    sheet_name = split_range(range_name)[0]
+    prefix = f"{sheet_name}!" if sheet_name else ""
+    values = get_google_client().get_values(sheet_id, f"{prefix}{column}:{column}")
+    keys = {cells[0] for cells in values if cells}
+    return [bool(row) and row[-1] in keys for row in rows]
+
+
+def _send_rows(sheet_id: str, range_name: str, rows: List[list]) -> bool:
+    """
+    Append a batch of queued rows in one call; used by the outbox flusher.
+    Runs on the flusher thread, so failures are raised rather than shown.
+    """
+    result = get_google_client().append_rows(
+        spreadsheet_id=sheet_id,
+        range_name=_append_range(range_name),
+        values=rows,
+        value_input_option="USER_ENTERED",
+        include_values_in_response=True,
+    )
+    notify_appended(sheet_id, result, rows)
+    return True
+
+
+# Session state key: when this session last looked for new dead letters
+DEAD_LETTERS_CHECKED_AT = "outbox_dead_letters_checked_at"
+
+
+@st.cache_resource
+def get_outbox_flusher() -> OutboxFlusher:
+    """Process-wide submission outbox and the thread that drains it."""
+    outbox = Outbox(st.secrets.get("OUTBOX_PATH", DEFAULT_OUTBOX_PATH))
+    flusher = OutboxFlusher(
+        outbox, _send_rows, is_permanent=is_rejected, already_sent=_sent_keys
+    )
+    # Deliver anything left over from a previous process
+    flusher.wake()
+    return flusher
+
+
 class ProductionRequestFormDB:
-    def __init__(self, range_name: str, spreadsheet: str, sheet_name: str = "sheet1"):
+    """
+    Rows of one sheet range as a DataFrame.
+
+    With `columns` (positions within `range_name`) only those columns are
+    fetched, as one batchGet of their contiguous runs, and only they make up
+    the frame. `headers` always holds the full header row, so callers look
+    columns up by name (`column_name(position)`) rather than by frame position.
+    A positional `schema` is given in full-range positions as well.
+    """
+
+    def __init__(
+        self,
+        range_name: str,
+        spreadsheet: str,
+        sheet_name: str = "sheet1",
+        schema: Optional[Sequence[ColumnSpec]] = None,
+        columns: Optional[Sequence[int]] = None,
+    ):
         self.google_client = get_google_client()
         # Extract spreadsheet ID from Streamlit secrets
         self.sheet_id = self.google_client.extract_spreadsheet_id(spreadsheet)
-        self.spreadsheet = self.google_client.open_sheet(self.sheet_id)
 
         # Optionally, get headers from the first row
         self.ranges = range_name
@@ -40,11 +501,102 @@ class ProductionRequestFormDB:
         self.headers = fetch_headers(
             self.sheet_id, self.sheet_name, self.ranges
         )
+        self.columns = tuple(sorted(set(columns))) if columns else None
+        self.column_ranges = projected_ranges(self.ranges, self.columns)
+        # Snapshots and memoized frames are per projection
+        self.key = range_key(spreadsheet, range_name, sheet_name, self.columns)
+        # Column types applied once, when get_df builds the frame
+        self.schema = project_schema(schema, self.columns) if schema else schema
+        # Last frame built by get_df, held weakly so it is measured only on demand
+        self._last_frame = None
+        # Whether the last get_df returned the local snapshot, not remote data,
+        # and the Drive version that snapshot was built from (None if unknown)
+        self.from_snapshot = False
+        self.snapshot_version = None
+
+    @property
+    def frame_bytes(self) -> int:
+        """
+        Memory footprint of the last frame built by get_df, in bytes; 0 once it
+        is gone. A deep measurement walks every string, so it is not kept up
+        to date on each load.
+        """
+        df = self._last_frame() if self._last_frame is not None else None
+        return frame_memory(df) if df is not None else 0
+
+    def ensure_headers(self) -> list:
+        """The full header row, read again while it is empty."""
+        if not self.headers:
+            self.headers = fetch_headers(self.sheet_id, self.sheet_name, self.ranges)
+        return self.headers
+
+    def column_name(self, position: int) -> Optional[str]:
+        """Header of the column at `position` in the full range."""
+        try:
+            return self.ensure_headers()[position]
+        except IndexError:
+            return None
+
+    @property
+    def column_names(self) -> list:
+        """Headers of the columns that make up the frame."""
+        return self.project_rows([self.headers])[0]
+
+    def frame_headers(self, df: pd.DataFrame) -> list:
+        """
+        Full-width header row as `df`, a frame built by this DB, names its
+        columns; None at positions that were not fetched. Unlike `headers` it
+        always matches the frame, even after a header was renamed.
+        """
+        positions = self.columns
+        if positions is None:
+            positions = range(len(df.columns))
+        names = [None] * (max(positions, default=-1) + 1)
+        for position, name in zip(positions, df.columns):
+            names[position] = name
+        return names
+
+    def project_rows(self, rows: List[list]) -> List[list]:
+        """Cut full-width sheet rows down to the projected columns."""
+        if self.columns is None:
+            return rows
+        return [
+            [row[i] if i < len(row) else None for i in self.columns] for row in rows
+        ]
+
+    def _column_widths(self) -> List[int]:
+        if len(self.column_ranges) == 1:
+            return []  # a single range needs no joining
+        widths = []
+        for part in self.column_ranges:
+            start, end = column_bounds(part)
+            widths.append(column_number(end) - column_number(start) + 1)
+        return widths
+
+    @property
+    def spreadsheet(self) -> Optional[dict]:
+        """Spreadsheet metadata, fetched on first use and cached per spreadsheet."""
+        try:
+            return fetch_sheet_metadata(self.sheet_id)
+        except Exception as e:
+            _report("error", f"An error occurred: {e}")
+            return None
+
+    def sheet_properties(self) -> Optional[dict]:
+        """Properties of this DB's sheet (sheetId, title, gridProperties...)."""
+        for sheet in (self.spreadsheet or {}).get("sheets", []):
+            properties = sheet.get("properties", {})
+            if properties.get("title", "").casefold() == self.sheet_name.casefold():
+                return properties
+        return None
 
     def append_row(self, data: dict, questions):
         """
         Append a new row to the production request form.
         Maps dict keys to sheet headers.
+
+        The row is written to the local outbox and the call returns its outbox
+        id; the background flusher appends queued rows to the sheet in batches.
         """
         if not self.headers:
             st.error("Cannot append: Sheet headers not found.")
@@ -52,23 +604,121 @@ class ProductionRequestFormDB:
 
         # Map headers to values from data
         row = [data.get(questions(header), "") for header in range(len(self.headers))]
+        range_name = f"{self.sheet_name}!{self.ranges}"
+        column = key_column(range_name)
+        if column is not None:
+            # Pad up to the key column so the key lands there
+            width = column_number(column) - column_number(column_bounds(self.ranges)[0])
+            row += [""] * (width - len(row))
+            row.append(uuid.uuid4().hex)
         try:
-            result = self.google_client.append_values(
-                spreadsheet_id=self.sheet_id,
-                range_name=self.ranges,
-                values=[row],
-                value_input_option="USER_ENTERED",
-            )
-            return result
+            flusher = get_outbox_flusher()
+            outbox_id = flusher.outbox.put(self.sheet_id, range_name, row)
+            flusher.wake()
+            # Tell this session about rows given up on since it last checked,
+            # not about every dead letter ever recorded
+            checked_at = time.time()
+            since = st.session_state.get(DEAD_LETTERS_CHECKED_AT, checked_at)
+            st.session_state[DEAD_LETTERS_CHECKED_AT] = checked_at
+            dead = [
+                letter
+                for letter in flusher.outbox.dead_letters(range_name, since=since)
+                if letter["sheet_id"] == self.sheet_id
+            ]
+            if dead:
+                st.warning(
+                    f"{len(dead)} earlier submission(s) could not be saved to the "
+                    f"sheet (last error: {dead[-1]['error']})."
+                )
+            return outbox_id
         except Exception as e:
             st.error(f"Failed to append row: {e}")
             return None
 
-    def get_df(self):
+    def get_rows_after(self, row: int) -> list:
+        """
+        Fetch the raw rows below sheet row `row` (1-based, row 1 is the header).
+        Only the new rows travel over the wire, however long the sheet is.
+        """
+        bounds = [column_bounds(part) for part in self.column_ranges]
+        if None in bounds:
+            raise ValueError(f"Cannot read rows after {row} of range {self.ranges}.")
+        if len(bounds) == 1:
+            start_col, end_col = bounds[0]
+            return self.google_client.get_values(
+                self.sheet_id, f"{self.sheet_name}!{start_col}{row + 1}:{end_col}"
+            )
+        value_ranges = self.google_client.batch_get_values(
+            self.sheet_id,
+            [
+                f"{self.sheet_name}!{start_col}{row + 1}:{end_col}"
+                for start_col, end_col in bounds
+            ],
+        )
+        blocks = [value_range.get("values", []) for value_range in value_ranges]
+        return join_blocks(blocks, self._column_widths())
+
+    def get_df(self, use_snapshot: bool = True, reconcile: bool = True):
         """
         Fetch all rows from a Google Sheet as a pandas DataFrame.
-        Handles missing or incomplete rows by filling with None and logs issues in Streamlit.
+        Handles missing or incomplete rows by filling with None and reports issues
+        in Streamlit (or the log, on background threads).
+
+        The first call in a process serves the local snapshot when there is one.
+        With `reconcile` it is then checked against the remote sheet in the
+        background, and only downloaded again if the spreadsheet changed since
+        the snapshot was written. SheetTail passes False and catches up itself.
         """
+        key = self.key
+        if use_snapshot:
+            with _snapshots_lock:
+                first_read = key not in _snapshots_served
+                _snapshots_served.add(key)
+            snapshot = load_snapshot(*key) if first_read else None
+            if snapshot is not None:
+                if self.schema:
+                    snapshot = apply_schema(snapshot, self.schema)
+                self.from_snapshot = True
+                self.snapshot_version = snapshot_version(*key)
+                if reconcile:
+                    threading.Thread(
+                        target=self._reconcile_snapshot,
+                        args=(snapshot, self.snapshot_version),
+                        daemon=True,
+                    ).start()
+                return snapshot
+
+        self.from_snapshot = False
+        df = self._fetch_df()
+        if use_snapshot and _snapshot_frames.get(key) is not df:
+            if save_snapshot(df, *key, version=_frame_version(key, df)):
+                _snapshot_frames[key] = df
+        return df
+
+    def _reconcile_snapshot(self, snapshot: pd.DataFrame, version: Optional[str]):
+        """Replace a served snapshot with the remote data and tell the loaders."""
+        key = self.key
+        with background_priority():
+            current = fetch_file_version(self.sheet_id)
+            if current and current == version:
+                # Unchanged since the snapshot was written: it is the remote data
+                _frames[key] = (current, snapshot)
+                _snapshot_frames[key] = snapshot
+                return
+            df = self._fetch_df()
+        if save_snapshot(df, *key, version=_frame_version(key, df)):
+            _snapshot_frames[key] = df
+            notify_reconciled(key)
+
+    def _fetch_df(self):
+        key = self.key
+        # Read the version before the values so the pair is never newer than the data
+        version = fetch_file_version(self.sheet_id)
+        cached = _frames.get(key)
+        if version and cached and cached[0] == version:
+            return cached[1]
+
+        headers = []
         try:
             # Fetch data from Google Sheets
             # result = (
@@ -81,35 +731,22 @@ class ProductionRequestFormDB:
             #     .execute()
             # )
 
-            values = fetch_headers(self.sheet_id, self.sheet_name, self.ranges, value_0=False)
+            blocks = fetch_column_ranges(
+                self.sheet_id, self.sheet_name, self.column_ranges
+            )
+            values = join_blocks(blocks, self._column_widths())
 
             if not values:
                 # st.warning("No data found in the sheet.")
                 return pd.DataFrame()  # empty DataFrame
 
             headers = values[0]
-            data_rows = values[1:]
-
-            fixed_rows = []
-
-            for i, row in enumerate(data_rows, start=1):
-                # Handle completely empty row
-                if not row:
-                    # st.warning(f"Row {i} is empty. Filling with None.")
-                    row = [None] * len(headers)
-                # Handle short row
-                elif len(row) < len(headers):
-                    # st.warning(f"Row {i} has {len(row)} columns, expected {len(headers)}. Padding with None.")
-                    row += [None] * (len(headers) - len(row))
-                # Handle extra-long row
-                elif len(row) > len(headers):
-                    # st.warning(f"Row {i} has {len(row)} columns, expected {len(headers)}. Truncating extra values.")
-                    row = row[: len(headers)]
-
-                fixed_rows.append(row)
-
-            # Create DataFrame safely
-            df = pd.DataFrame(fixed_rows, columns=headers)
+            df = build_frame(headers, values[1:])
+            if self.schema:
+                df = apply_schema(df, self.schema)
+            self._last_frame = weakref.ref(df)
+            if version:
+                _frames[key] = (version, df)
             # st.success(f"Data fetched successfully! {len(df)} rows loaded.")
 
             # Optional: display first few rows for debugging
@@ -118,7 +755,164 @@ class ProductionRequestFormDB:
             return df
 
         except Exception as e:
-            st.error(f"Failed to get rows: {e}")
+            if cached:
+                # Degraded API: keep showing the last frame we built
+                _report(
+                    "warning", f"Showing cached data, the sheet could not be read: {e}"
+                )
+                return cached[1]
+            _report("error", f"Failed to get rows: {e}")
             return pd.DataFrame(
                 columns=headers
             )  # Return empty DataFrame with headers if available
+
+# Every this many syncs that find the spreadsheet changed, SheetTail reloads it
+# in full so rows edited or deleted in place are picked up as well
+FULL_SYNC_EVERY = 10
+
+
+class SheetTail:
+    """
+    In-memory copy of an append-only sheet that refreshes by fetching only the
+    rows added since the last sync. Each such read starts at the last synced
+    row; if that row no longer holds what was synced (rows above it were
+    deleted, or it was edited) the sheet is reloaded in full. So is it every
+    FULL_SYNC_EVERY syncs, which picks up edits further up.
+    """
+
+    def __init__(self, db: ProductionRequestFormDB):
+        self.db = db
+        self.df = pd.DataFrame()
+        # Sheet row number of the last synced row; 0 means nothing synced yet
+        self.last_row = 0
+        # Drive version of the spreadsheet at the last sync
+        self.version = None
+        # Incremental syncs since the last full load
+        self.partial_syncs = 0
+        # The last synced row's cells as the sheet gave them (see _row_key);
+        # None right after a full load, when only the typed frame is at hand
+        self.anchor = None
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """Forget the synced rows so the next sync reloads the whole sheet."""
+        with self._lock:
+            self.df = pd.DataFrame()
+            self.last_row = 0
+            self.version = None
+            self.partial_syncs = 0
+            self.anchor = None
+
+    def mark_stale(self):
+        """
+        Make the next sync read the sheet even if the file version looks
+        unchanged; that version is cached for a while and may predate an append.
+        """
+        with self._lock:
+            self.version = None
+
+    def sync(self) -> pd.DataFrame:
+        """Bring the frame up to date and return it."""
+        with self._lock:
+            # A long-lived tail must not keep a header row that failed to load
+            self.db.ensure_headers()
+            version = fetch_file_version(self.db.sheet_id)
+            if self.last_row == 0:
+                return self._load(version)
+
+            if version and version == self.version:
+                # Spreadsheet untouched since the last sync: nothing to fetch
+                return self.df
+
+            if self.partial_syncs >= FULL_SYNC_EVERY:
+                return self._load(version)
+
+            try:
+                # From the last synced row on, to check it is still in place
+                rows = self.db.get_rows_after(self.last_row - 1)
+            except Exception as e:
+                _report("error", f"Failed to sync new rows: {e}")
+                return self.df
+
+            if not rows or (
+                self.anchor is not None and self._row_key(rows[0]) != self.anchor
+            ):
+                # Rows above were deleted (or this one edited): positions are off
+                return self._load(version)
+
+            self.anchor = self._row_key(rows[0])
+            self._extend(rows[1:])
+            # The frame memoized at the last full load is older than ours now
+            _frames.pop(self.db.key, None)
+            self.version = version
+            self.partial_syncs += 1
+            return self.df
+
+    def _load(self, version: Optional[str]) -> pd.DataFrame:
+        # Full read; a failed one keeps the rows we already have
+        df = self.db.get_df(reconcile=False)
+        if len(df.columns):
+            self.df = df
+            self.last_row = len(df) + 1  # header row + data rows
+            self.version = version
+            self.partial_syncs = 0
+            self.anchor = None
+            if self.db.from_snapshot:
+                # A snapshot is as new as the version it was written at (unset
+                # if unknown): catch up by reading only the rows added since
+                self.version = self.db.snapshot_version
+                threading.Thread(target=self._catch_up, daemon=True).start()
+        return self.df
+
+    def _catch_up(self):
+        """Sync a frame loaded from a snapshot, then tell the loaders if it changed."""
+        loaded = self.df
+        with background_priority():
+            self.sync()
+        if self.df is not loaded:
+            notify_reconciled(self.db.key)
+
+    def _row_key(self, row: list) -> tuple:
+        # Comparable form of a raw row, whether it came from a read or an
+        # append response: frame width, blanks as "", no trailing blanks
+        width = len(self.df.columns) or len(self.db.column_names)
+        cells = ["" if cell is None else str(cell) for cell in row[:width]]
+        while cells and cells[-1] == "":
+            cells.pop()
+        return tuple(cells)
+
+    def _extend(self, rows: list):
+        if rows:
+            # Name new rows like the frame they join, not the cached header row
+            names = list(self.df.columns) or self.db.column_names
+            new_df = build_frame(names, rows)
+            if self.db.schema:
+                new_df = apply_schema(new_df, self.db.schema)
+                self.df = concat_typed(self.df, new_df)
+            else:
+                self.df = pd.concat([self.df, new_df], ignore_index=True)
+            self.last_row += len(rows)
+            self.anchor = self._row_key(rows[-1])
+
+    def apply_append(
+        self, sheet_id: str, sheet_name: str, first_row: int, rows: List[list]
+    ) -> bool:
+        """
+        Patch rows we just appended into the frame without re-reading the sheet.
+        Returns False when the rows cannot be placed (a gap or another sheet),
+        in which case the next sync picks them up.
+        """
+        if sheet_id != self.db.sheet_id:
+            return False
+        if sheet_name and sheet_name.casefold() != self.db.sheet_name.casefold():
+            return False
+        with self._lock:
+            if self.last_row == 0:
+                return False
+            if first_row <= self.last_row:
+                # Already synced (e.g. by a concurrent sync)
+                return first_row + len(rows) - 1 <= self.last_row
+            if first_row != self.last_row + 1:
+                return False
+            self._extend(self.db.project_rows(rows))
+            return True
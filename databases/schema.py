@@ -0,0 +1,140 @@
+import re
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Day zero of spreadsheet serial dates
+EXCEL_EPOCH = pd.Timestamp("1899-12-30")
+# Serial of 9999-12-31, the last date a spreadsheet can hold
+MAX_SERIAL = 2958465
+
+_AMOUNT = re.compile(r"^\s*([-+]?\d*\.?\d+)\s*(.*?)\s*$")
+
+
+@dataclass(frozen=True)
+class ColumnSpec:
+    """How to type one sheet column, addressed by its position in the header row."""
+
+    index: int
+    kind: str  # "date", "amount" or "category"
+
+
+# Columns of the STORED production request sheet (A:P)
+STORED_SCHEMA = (
+    ColumnSpec(0, "category"),  # user
+    ColumnSpec(1, "category"),  # assigned to / type
+    ColumnSpec(2, "category"),  # team / topic
+    ColumnSpec(4, "amount"),  # "5 kg"
+    ColumnSpec(6, "category"),  # room
+    ColumnSpec(7, "category"),  # building
+    ColumnSpec(8, "category"),  # zone
+    ColumnSpec(13, "date"),  # request date
+    ColumnSpec(14, "date"),  # to date
+)
+
+
+def project_schema(
+    schema: Sequence[ColumnSpec], columns: Optional[Sequence[int]]
+) -> Tuple[ColumnSpec, ...]:
+    """
+    Re-address a schema to a frame holding only `columns` (sorted positions of
+    the full sheet); specs for columns that were left out are dropped.
+    """
+    if columns is None:
+        return tuple(schema)
+    position = {column: i for i, column in enumerate(columns)}
+    return tuple(
+        ColumnSpec(position[spec.index], spec.kind)
+        for spec in schema
+        if spec.index in position
+    )
+
+
+def unit_column(amount_col) -> str:
+    """Name of the column holding the unit split off an amount column."""
+    return f"{amount_col} Unit"
+
+
+def parse_dates(series: pd.Series) -> pd.Series:
+    """
+    Convert spreadsheet serials ("45938") and date strings to datetime64 in a
+    single pass. Returns a new Series; the input is never modified.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    if pd.api.types.is_numeric_dtype(series):
+        return EXCEL_EPOCH + pd.to_timedelta(series, unit="D")
+
+    # Serials parse as numbers (vectorised); everything else stays NaN
+    serials = pd.to_numeric(series, errors="coerce")
+    serials = serials.where((serials >= 0) & (serials <= MAX_SERIAL))
+    converted = EXCEL_EPOCH + pd.to_timedelta(serials, unit="D")
+
+    # Only the non-numeric values go through the date-string parser
+    is_text = serials.isna()
+    if is_text.any():
+        text = series[is_text]
+        if text.dtype == object:
+            text = text.str.strip()
+        converted[is_text] = pd.to_datetime(text, errors="coerce")
+    return converted
+
+
+def split_amount(series: pd.Series):
+    """Split "5 kg" into a numeric amount (5.0) and a categorical unit ("kg")."""
+    if pd.api.types.is_numeric_dtype(series):
+        return series, None
+    parts = series.astype("string").str.extract(_AMOUNT)
+    amount = pd.to_numeric(parts[0], errors="coerce")
+    unit = parts[1].replace("", pd.NA).astype("category")
+    return amount, unit
+
+
+def apply_schema(df: pd.DataFrame, schema: Sequence[ColumnSpec]) -> pd.DataFrame:
+    """
+    Return a typed copy of a raw sheet frame: datetime64 dates, numeric amounts
+    with the unit in an extra categorical column at the end, and categorical
+    labels. Already typed columns are left alone, so applying it twice is safe.
+    """
+    typed = df.copy(deep=False)
+    for spec in schema:
+        if spec.index >= len(typed.columns):
+            continue
+        name = typed.columns[spec.index]
+        column = typed.iloc[:, spec.index]
+
+        if spec.kind == "date":
+            typed.isetitem(spec.index, parse_dates(column))
+        elif spec.kind == "category":
+            if not isinstance(column.dtype, pd.CategoricalDtype):
+                typed.isetitem(spec.index, column.astype("category"))
+        elif spec.kind == "amount":
+            amount, unit = split_amount(column)
+            typed.isetitem(spec.index, amount)
+            if unit is not None:
+                typed[unit_column(name)] = unit
+    return typed
+
+
+def concat_typed(head: pd.DataFrame, tail: pd.DataFrame) -> pd.DataFrame:
+    """Append typed rows to a typed frame without losing categorical dtypes."""
+    head = head.copy(deep=False)
+    tail = tail.copy(deep=False)
+    for i in range(len(head.columns)):
+        head_col = head.iloc[:, i]
+        if i >= len(tail.columns):
+            break
+        if not isinstance(head_col.dtype, pd.CategoricalDtype):
+            continue
+        tail_col = tail.iloc[:, i].astype("category")
+        # Categories stay sorted, as astype("category") leaves them, so sorting
+        # by code still sorts by label; both sides are recoded onto the union
+        categories = union_categoricals(
+            [head_col, tail_col], sort_categories=True
+        ).categories
+        if not categories.equals(head_col.cat.categories):
+            head.isetitem(i, head_col.cat.set_categories(categories))
+        tail.isetitem(i, tail_col.cat.set_categories(categories))
+    return pd.concat([head, tail], ignore_index=True)
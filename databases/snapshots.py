@@ -0,0 +1,116 @@
+import os
+import re
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+
+# Local Parquet copies of sheet ranges, so a fresh process can serve data
+# before its first round trip to Google.
+DEFAULT_SNAPSHOT_DIR = os.path.join(".cache", "snapshots")
+
+# Callbacks run once a range served from a snapshot has been reconciled with
+# the remote sheet, keyed by name so Streamlit reruns replace rather than add.
+# Each is stored with the (sheet_id, sheet_name, ranges) key it listens to,
+# or None for every range.
+_reconcile_listeners: Dict[
+    str, Tuple[Optional[Tuple[str, str, str]], Callable[[], None]]
+] = {}
+_listeners_lock = threading.Lock()
+
+
+def snapshot_dir() -> str:
+    return st.secrets.get("SNAPSHOT_DIR", DEFAULT_SNAPSHOT_DIR)
+
+
+def snapshot_path(sheet_id: str, sheet_name: str, ranges: str) -> str:
+    """File holding the snapshot of one spreadsheet / sheet / range."""
+    key = "__".join(
+        re.sub(r"[^A-Za-z0-9_-]", "-", part) for part in (sheet_id, sheet_name, ranges)
+    )
+    return os.path.join(snapshot_dir(), f"{key}.parquet")
+
+
+def load_snapshot(sheet_id: str, sheet_name: str, ranges: str) -> Optional[pd.DataFrame]:
+    """Return the stored snapshot, or None if there is none or it cannot be read."""
+    path = snapshot_path(sheet_id, sheet_name, ranges)
+    if not os.path.exists(path):
+        return None
+    try:
+        return pd.read_parquet(path)
+    except Exception:
+        # Corrupt file or no Parquet engine: fall back to the remote sheet
+        return None
+
+
+def snapshot_version(sheet_id: str, sheet_name: str, ranges: str) -> Optional[str]:
+    """Drive version of the spreadsheet the snapshot was built from, if known."""
+    try:
+        with open(f"{snapshot_path(sheet_id, sheet_name, ranges)}.version") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def save_snapshot(
+    df: pd.DataFrame,
+    sheet_id: str,
+    sheet_name: str,
+    ranges: str,
+    version: Optional[str] = None,
+) -> bool:
+    """
+    Write the frame atomically, with the Drive `version` it was built from when
+    known; returns False when it cannot be snapshotted.
+    """
+    # Parquet needs unique string column names
+    if df.empty or not df.columns.is_unique:
+        return False
+
+    path = snapshot_path(sheet_id, sheet_name, ranges)
+    version_path = f"{path}.version"
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Drop the old version first: a crash part-way leaves it unknown, not wrong
+        if os.path.exists(version_path):
+            os.remove(version_path)
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        if version:
+            with open(tmp_path, "w") as f:
+                f.write(version)
+            os.replace(tmp_path, version_path)
+        return True
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+
+def on_snapshot_reconciled(
+    name: str,
+    callback: Callable[[], None],
+    key: Optional[Tuple[str, str, str]] = None,
+):
+    """
+    Register a callback (e.g. a loader's cache clear) to run once the range
+    `key` (sheet_id, sheet_name, ranges) has been reconciled; every range when
+    `key` is None.
+    """
+    with _listeners_lock:
+        _reconcile_listeners[name] = (key, callback)
+
+
+def notify_reconciled(key: Tuple[str, str, str]):
+    """Tell the listeners of range `key` that its data has been reconciled."""
+    with _listeners_lock:
+        listeners = list(_reconcile_listeners.values())
+    for listened, callback in listeners:
+        if listened is not None and listened != key:
+            continue
+        try:
+            callback()
+        except Exception:
+            pass
@@ -0,0 +1,132 @@
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict
+
+import httplib2
+from google.auth.exceptions import TransportError
+from googleapiclient.errors import HttpError
+
+# Status codes worth another attempt: quota (429) and server-side trouble
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+# Failures to get any answer from the API: DNS, TLS, refused or reset
+# connections and timeouts (OSError covers socket and ssl errors)
+NETWORK_ERRORS = (OSError, httplib2.ServerNotFoundError, TransportError)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an API that has been failing repeatedly."""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = 5
+    base_delay: float = 0.5
+    max_delay: float = 32.0
+    # Total seconds one call may spend, attempts and waits included
+    deadline: float = 60.0
+
+    def delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry number `attempt` (1-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+def is_network_error(error: Exception) -> bool:
+    """Whether a call failed without the API answering it."""
+    return isinstance(error, NETWORK_ERRORS) and not isinstance(error, HttpError)
+
+
+def is_transient(error: Exception, write: bool = False) -> bool:
+    """
+    Whether a failed call may succeed if repeated. A write that hit a 5xx or a
+    network error may already have been applied, so writes only retry on 429.
+    """
+    if isinstance(error, HttpError):
+        status = error.resp.status
+        return status == 429 if write else status in RETRYABLE_STATUS
+    return is_network_error(error) and not write
+
+
+def is_rejected(error: Exception) -> bool:
+    """Whether the API refused the request itself (4xx other than 408/429)."""
+    if isinstance(error, HttpError):
+        status = error.resp.status
+        return 400 <= status < 500 and status not in (408, 429)
+    return False
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failed calls; while open, calls fail at
+    once with CircuitOpenError. After `reset_timeout` one trial call is let
+    through and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, threshold: int = 5, reset_timeout: float = 30.0):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def before_call(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if self._trial or time.monotonic() - self._opened_at < self.reset_timeout:
+                raise CircuitOpenError("Google API unavailable, try again shortly")
+            self._trial = True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_ignored(self):
+        """
+        A call that failed in a way that says nothing about the API's health
+        (e.g. a 4xx): neither closes nor opens the circuit, but ends a trial so
+        the next call is let through instead.
+        """
+        with self._lock:
+            self._trial = False
+
+    def record_failure(self) -> bool:
+        """Count a failed call; returns True if this opened the circuit."""
+        with self._lock:
+            self._failures += 1
+            was_open = self._opened_at is not None
+            if self._trial or self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+            self._trial = False
+            return not was_open and self._opened_at is not None
+
+
+class ApiMetrics:
+    """Counters for the Google API calls of one client."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {
+            "calls": 0,
+            "retries": 0,
+            "retry_wait_seconds": 0.0,
+            "failures": 0,
+            "short_circuited": 0,
+            "circuit_opened": 0,
+        }
+
+    def add(self, name: str, amount: float = 1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._counters)
@@ -0,0 +1,56 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+DEFAULT_MAX_FIGURES = 128
+
+
+class FigureCache:
+    """
+    Bounded LRU of built Plotly figures, shared by every session.
+
+    Keys must capture everything a figure depends on (data version, filters,
+    chart id); figures are treated as read-only once cached.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_FIGURES):
+        self.max_entries = max_entries
+        self._figures: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, build: Callable[[], Any]):
+        """The figure cached under `key`, built with `build()` on a miss."""
+        with self._lock:
+            if key in self._figures:
+                self._figures.move_to_end(key)
+                self.hits += 1
+                return self._figures[key]
+            self.misses += 1
+
+        # Built outside the lock; two sessions missing at once both build
+        figure = build()
+        with self._lock:
+            self._figures[key] = figure
+            self._figures.move_to_end(key)
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+                self.evictions += 1
+        return figure
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._figures),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -1,17 +1,62 @@
 import json
-import os
 import re
-import tempfile
+import time
 from typing import List, Optional
 
+import httplib2
 import streamlit as st
 from google.oauth2.service_account import Credentials as ServiceAccountCredentials
+from google_auth_httplib2 import AuthorizedHttp
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.http import HttpRequest, MediaIoBaseUpload
 from google.auth.transport.requests import Request
 
+from utils.api_retry import (
+    ApiMetrics,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    is_network_error,
+    is_transient,
+)
+from utils.request_scheduler import get_scheduler
+
+# Resumable upload chunk size; must be a multiple of 256 KiB
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+UPLOAD_CHUNK_RETRIES = 3
+# Socket timeout of a single HTTP request; a timed out read is retried
+HTTP_TIMEOUT = 30
+# Spreadsheet metadata we use: titles, sheet ids and grid sizes (no cell data)
+SHEET_METADATA_FIELDS = (
+    "spreadsheetId,properties(title),"
+    "sheets(properties(sheetId,title,index,gridProperties(rowCount,columnCount)))"
+)
+
+
+def build_service(service_name: str, version: str, credentials):
+    """
+    Build an API service from the discovery documents bundled with
+    google-api-python-client, so no discovery request goes over the network.
+    """
+
+    def build_request(http, *args, **kwargs):
+        # httplib2.Http is not thread-safe: give every request its own connection
+        # so one service object can be shared by all sessions.
+        return HttpRequest(
+            AuthorizedHttp(credentials, http=httplib2.Http(timeout=HTTP_TIMEOUT)), *args, **kwargs
+        )
+
+    return build(
+        service_name,
+        version,
+        credentials=credentials,
+        requestBuilder=build_request,
+        static_discovery=True,
+        cache_discovery=False,
+    )
+
 
 class GoogleSheetsClient:
     def __init__(
@@ -26,6 +71,11 @@ class GoogleSheetsClient:
                 "https://www.googleapis.com/auth/spreadsheets",
                 "https://www.googleapis.com/auth/drive",
             ]
+        # Every call waits for a token from the process-wide read/write/drive buckets
+        self.scheduler = get_scheduler(dict(st.secrets.get("API_QUOTAS", {})))
+        self.retry_policy = RetryPolicy()
+        self.breaker = CircuitBreaker()
+        self.metrics = ApiMetrics()
 
 
         if service_account:
@@ -44,13 +94,16 @@ class GoogleSheetsClient:
                 json.loads(st.secrets["google_service_account"]["CREDENTIAL"]),
                 scopes=["https://www.googleapis.com/auth/spreadsheets"],
             )
-            sheet_service = build("sheets", "v4", credentials=service_creds)
+            sheet_service = build_service("sheets", "v4", service_creds)
 
             # 1. Try to load token from Google Sheet
-            result = sheet_service.spreadsheets().values().get(
-                spreadsheetId=self.spreadsheet_id,
-                range=self.token_range
-            ).execute()
+            result = self.execute(
+                sheet_service.spreadsheets().values().get(
+                    spreadsheetId=self.spreadsheet_id,
+                    range=self.token_range
+                ),
+                "read",
+            )
             values = result.get("values", [])
 
             if values and values[0] and values[0][0]:
@@ -70,59 +123,170 @@ class GoogleSheetsClient:
                     self.creds = flow.run_local_server(port=0)
 
                 # Save new token JSON into Google Sheet
-                sheet_service.spreadsheets().values().update(
-                    spreadsheetId=self.spreadsheet_id,
-                    range=self.token_range,
-                    valueInputOption="RAW",
-                    body={"values": [[self.creds.to_json()]]}
-                ).execute()
-
-        # 3. Build final services
-        self.sheets_service = build("sheets", "v4", credentials=self.creds)
-        self.drive_service = build("drive", "v3", credentials=self.creds)
+                self.execute(
+                    sheet_service.spreadsheets().values().update(
+                        spreadsheetId=self.spreadsheet_id,
+                        range=self.token_range,
+                        valueInputOption="RAW",
+                        body={"values": [[self.creds.to_json()]]}
+                    ),
+                    "write",
+                )
 
-        # Separate services for Sheets and Drive
-        self.sheets_service = build("sheets", "v4", credentials=self.creds)
-        self.drive_service = build("drive", "v3", credentials=self.creds)
+        # 3. Build final services, once: separate services for Sheets and Drive
+        self.sheets_service = build_service("sheets", "v4", self.creds)
+        self.drive_service = build_service("drive", "v3", self.creds)
 
     def get_service(self):
         """Return the Google Sheets API service object."""
         return self.sheets_service
 
-    def open_sheet(self, spreadsheet_id: str):
+    def execute(self, request, kind: str = "read", deadline: Optional[float] = None):
+        """
+        Run an API request once the scheduler grants a `kind` token ("read",
+        "write" or "drive"). Over quota, calls queue here instead of failing
+        with 429; background work waits behind interactive calls.
+
+        Transient failures (429, 5xx, network errors) are retried with jittered
+        exponential backoff until `deadline` seconds have passed. Calls that
+        still fail count towards the circuit breaker; while it is open this
+        raises CircuitOpenError at once so callers can serve cached data.
+        """
+        policy = self.retry_policy
+        deadline = policy.deadline if deadline is None else deadline
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            self.metrics.add("short_circuited")
+            raise
+
+        started = time.monotonic()
+        self.metrics.add("calls")
+        for attempt in range(1, policy.max_attempts + 1):
+            self.scheduler.acquire(kind)
+            try:
+                result = request.execute()
+            except Exception as error:
+                delay = policy.delay(attempt)
+                out_of_time = time.monotonic() - started + delay > deadline
+                if not is_transient(error, write=kind == "write"):
+                    if is_network_error(error):
+                        # A write that may have landed is not repeated, but the
+                        # API was unreachable all the same
+                        self.metrics.add("failures")
+                        if self.breaker.record_failure():
+                            self.metrics.add("circuit_opened")
+                    else:
+                        # The API answered; the request itself is wrong
+                        self.breaker.record_ignored()
+                    raise
+                if attempt == policy.max_attempts or out_of_time:
+                    self.metrics.add("failures")
+                    if self.breaker.record_failure():
+                        self.metrics.add("circuit_opened")
+                    raise
+                self.metrics.add("retries")
+                self.metrics.add("retry_wait_seconds", delay)
+                time.sleep(delay)
+            else:
+                self.breaker.record_success()
+                return result
+
+    def get_metadata(
+        self, spreadsheet_id: str, fields: Optional[str] = SHEET_METADATA_FIELDS
+    ) -> dict:
+        """Spreadsheet metadata restricted to `fields` (None for everything)."""
+        request = self.sheets_service.spreadsheets().get(
+            spreadsheetId=spreadsheet_id, fields=fields
+        )
+        return self.execute(request)
+
+    def open_sheet(
+        self, spreadsheet_id: str, fields: Optional[str] = SHEET_METADATA_FIELDS
+    ):
         """Get spreadsheet metadata using the official API."""
         try:
-            sheet = (
-                self.sheets_service.spreadsheets()
-                .get(spreadsheetId=spreadsheet_id)
-                .execute()
-            )
-            return sheet
+            return self.get_metadata(spreadsheet_id, fields)
         except HttpError as error:
             st.error(f"An error occurred: {error}")
             return None
 
+    def get_values(self, spreadsheet_id: str, range_name: str) -> List[list]:
+        """Read the values of a single A1 range."""
+        result = self.execute(
+            self.sheets_service.spreadsheets()
+            .values()
+            .get(spreadsheetId=spreadsheet_id, range=range_name)
+        )
+        return result.get("values", [])
+
+    def get_file_version(self, file_id: str) -> str:
+        """
+        Return a token that changes whenever the Drive file (e.g. a spreadsheet)
+        is modified. A metadata-only call, far cheaper than reading values.
+        """
+        file = self.execute(
+            self.drive_service.files().get(
+                fileId=file_id, fields="version,modifiedTime", supportsAllDrives=True
+            ),
+            "drive",
+        )
+        return f"{file.get('version')}@{file.get('modifiedTime')}"
+
+    def batch_get_values(self, spreadsheet_id: str, ranges: List[str]) -> List[dict]:
+        """Read several A1 ranges of one spreadsheet in a single request."""
+        result = self.execute(
+            self.sheets_service.spreadsheets()
+            .values()
+            .batchGet(spreadsheetId=spreadsheet_id, ranges=ranges)
+        )
+        # valueRanges come back in request order
+        return result.get("valueRanges", [])
+
+    def append_rows(
+        self,
+        spreadsheet_id: str,
+        range_name: str,
+        values: list[list],
+        value_input_option="USER_ENTERED",
+        include_values_in_response: bool = False,
+    ) -> dict:
+        """
+        Append rows to the spreadsheet and return the API response; errors are
+        raised. No Streamlit output, so it is safe on background threads.
+        With `include_values_in_response` the response carries the rows as the
+        sheet renders them (updates.updatedData).
+        """
+        return self.execute(
+            self.sheets_service.spreadsheets()
+            .values()
+            .append(
+                spreadsheetId=spreadsheet_id,
+                range=range_name,
+                valueInputOption=value_input_option,
+                insertDataOption="INSERT_ROWS",
+                includeValuesInResponse=include_values_in_response,
+                body={"values": values},
+            ),
+            "write",
+        )
+
     def append_values(
         self,
         spreadsheet_id: str,
         range_name: str,
         values: list[list],
         value_input_option="USER_ENTERED",
+        include_values_in_response: bool = False,
     ):
-        """Append rows to the spreadsheet."""
+        """Append rows to the spreadsheet, reporting the outcome in the page."""
         try:
-            body = {"values": values}
-            result = (
-                self.sheets_service.spreadsheets()
-                .values()
-                .append(
-                    spreadsheetId=spreadsheet_id,
-                    range=range_name,
-                    valueInputOption=value_input_option,
-                    insertDataOption="INSERT_ROWS",
-                    body=body,
-                )
-                .execute()
+            result = self.append_rows(
+                spreadsheet_id,
+                range_name,
+                values,
+                value_input_option,
+                include_values_in_response,
             )
             st.success(f"{result.get('updates').get('updatedCells')} cells appended.")
             return result
@@ -159,30 +323,32 @@ class GoogleSheetsClient:
         Upload an image (Streamlit UploadedFile) to a Google Drive folder in a Shared Drive.
         """
         try:
-            # Save the uploaded file temporarily
-            with tempfile.NamedTemporaryFile(
-                delete=False, suffix=os.path.splitext(uploaded_file.name)[1]
-            ) as tmp:
-                temp_path = tmp.name
-                tmp.write(uploaded_file.getbuffer())
-
             file_metadata = {
                 "name": uploaded_file.name,
                 "parents": [folder_id],  # Folder ID inside the Shared Drive
             }
             st.write("file metadata", file_metadata)
-            media = MediaFileUpload(temp_path, mimetype=uploaded_file.type)
-
-            file = (
-                self.drive_service.files()
-                .create(
-                    body=file_metadata,
-                    media_body=media,
-                    fields="id, webViewLink",
-                    supportsAllDrives=True,  # Required for Shared Drives
-                )
-                .execute()
+            # Stream straight from the in-memory upload: no temp file, no extra copy.
+            # Resumable chunks mean a dropped connection only re-sends one chunk.
+            uploaded_file.seek(0)
+            media = MediaIoBaseUpload(
+                uploaded_file,
+                mimetype=uploaded_file.type,
+                chunksize=UPLOAD_CHUNK_SIZE,
+                resumable=True,
+            )
+
+            request = self.drive_service.files().create(
+                body=file_metadata,
+                media_body=media,
+                fields="id, webViewLink",
+                supportsAllDrives=True,  # Required for Shared Drives
             )
+            file = None
+            while file is None:
+                self.scheduler.acquire("drive")
+                _, file = request.next_chunk(num_retries=UPLOAD_CHUNK_RETRIES)
+            uploaded_file.seek(0)  # reset pointer so Streamlit can still use it
 
             st.success(f"✅ Uploaded successfully: {file['webViewLink']}")
             return file["webViewLink"]
@@ -0,0 +1,65 @@
+import io
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Tuple
+
+from PIL import Image, ImageOps
+
+# Pillow releases the GIL while decoding, resizing and encoding, so a small
+# thread pool keeps this work off the Streamlit script thread.
+_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="image")
+
+_MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+_EXTENSIONS = {"JPEG": ".jpg", "WEBP": ".webp"}
+
+
+@dataclass
+class ProcessedImage:
+    """An attachment ready to send: downscaled, recompressed, EXIF stripped."""
+
+    data: bytes
+    mime_type: str
+    filename: str
+    size: Tuple[int, int]
+
+
+def _encode(img: Image.Image, image_format: str, quality: int) -> bytes:
+    out = io.BytesIO()
+    # No exif= argument: the metadata (GPS, device, ...) is dropped
+    img.save(out, format=image_format, quality=quality, optimize=True)
+    return out.getvalue()
+
+
+def preprocess_image(
+    data: bytes,
+    name: str = "image",
+    max_dimension: int = 1600,
+    image_format: str = "JPEG",
+    quality: int = 82,
+) -> ProcessedImage:
+    """Resize so the longest side is at most `max_dimension` and recompress."""
+    image_format = image_format.upper()
+    with Image.open(io.BytesIO(data)) as original:
+        # Bake the EXIF orientation into the pixels before the EXIF is dropped
+        img = ImageOps.exif_transpose(original)
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        img.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+        stem = os.path.splitext(os.path.basename(name))[0] or "image"
+        return ProcessedImage(
+            data=_encode(img, image_format, quality),
+            mime_type=_MIME_TYPES.get(image_format, f"image/{image_format.lower()}"),
+            filename=f"{stem}{_EXTENSIONS.get(image_format, '.' + image_format.lower())}",
+            size=img.size,
+        )
+
+
+def submit_preprocess(uploaded_file, **options) -> Future:
+    """
+    Start preprocessing a Streamlit UploadedFile in the worker pool.
+    `options` are passed on to preprocess_image.
+    """
+    data = uploaded_file.getvalue()
+    return _pool.submit(preprocess_image, data, uploaded_file.name, **options)
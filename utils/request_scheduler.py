@@ -0,0 +1,101 @@
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# Priority lanes: lower goes first
+INTERACTIVE = 0
+BACKGROUND = 1
+
+_priority = contextvars.ContextVar("request_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def background_priority():
+    """Run API calls made in this block behind the ones a user is waiting on."""
+    token = _priority.set(BACKGROUND)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class TokenBucket:
+    """
+    `rate` requests per second with bursts of up to `capacity`. Callers that
+    find it empty queue up and are served by priority, then in arrival order.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._waiting = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        refilled = self._tokens + (now - self._updated) * self.rate
+        self._tokens = min(self.capacity, refilled)
+        self._updated = now
+
+    def acquire(self, priority: int = INTERACTIVE) -> float:
+        """Take one token, waiting for it if needed; returns the seconds waited."""
+        started = time.monotonic()
+        with self._cond:
+            ticket = (priority, next(self._seq))
+            heapq.heappush(self._waiting, ticket)
+            while True:
+                self._refill()
+                if self._waiting[0] == ticket and self._tokens >= 1:
+                    heapq.heappop(self._waiting)
+                    self._tokens -= 1
+                    # The next in line may be able to go too
+                    self._cond.notify_all()
+                    return time.monotonic() - started
+                if self._waiting[0] == ticket:
+                    self._cond.wait((1 - self._tokens) / self.rate)
+                else:
+                    self._cond.wait()
+
+
+class RequestScheduler:
+    """Token buckets by call kind ("read", "write", "drive"), shared process-wide."""
+
+    def __init__(self, buckets: Dict[str, TokenBucket]):
+        self.buckets = buckets
+        self.waited: Dict[str, float] = {name: 0.0 for name in buckets}
+
+    def acquire(self, kind: str, priority: Optional[int] = None):
+        if priority is None:
+            priority = _priority.get()
+        waited = self.buckets[kind].acquire(priority)
+        if waited:
+            self.waited[kind] += waited
+
+
+# Per-minute request quotas; the Sheets defaults are 60 per minute per user
+DEFAULT_QUOTAS = {"read": 60, "write": 60, "drive": 600}
+
+_scheduler: Optional[RequestScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler(quotas: Optional[Dict[str, float]] = None) -> RequestScheduler:
+    """The process-wide scheduler; `quotas` only apply when it is first created."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            quotas = {**DEFAULT_QUOTAS, **(quotas or {})}
+            _scheduler = RequestScheduler(
+                {
+                    kind: TokenBucket(per_minute / 60, capacity=max(1, per_minute / 6))
+                    for kind, per_minute in quotas.items()
+                }
+            )
+        return _scheduler
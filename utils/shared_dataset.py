@@ -0,0 +1,183 @@
+import threading
+import time
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import streamlit as st
+
+from utils.request_scheduler import background_priority
+
+# How often the background refresher looks for datasets that are about to expire
+REFRESH_INTERVAL = 10
+
+
+class SharedDataset:
+    """
+    A dataset loaded once per process and shared by every session.
+
+    Only the very first load blocks. After that the background refresher reloads
+    the data shortly before `ttl` runs out and swaps the new value in, so
+    readers always get the previous version immediately (stale-while-revalidate).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        loader: Callable[[], Any],
+        ttl: float,
+        refresh_ahead: float = 60,
+        show_spinner: Optional[str] = None,
+    ):
+        self.name = name
+        self.loader = loader
+        self.ttl = ttl
+        self.refresh_ahead = min(refresh_ahead, ttl / 2)
+        self.show_spinner = show_spinner
+        # (value, version, loaded_at) replaced as a whole so readers never see a mix
+        self._state = (None, 0, 0.0)
+        self._load_lock = threading.Lock()
+        self._refreshing = threading.Event()
+        # key -> (version, value) of things built from the data by derive()
+        self._derived: Dict[str, Tuple[int, Any]] = {}
+
+    @property
+    def version(self) -> int:
+        """Incremented on every swap; use it to key anything derived from the data."""
+        return self._state[1]
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self._state[2]
+
+    @property
+    def loaded(self) -> bool:
+        return self._state[1] > 0
+
+    def __call__(self):
+        value, version, _ = self._state
+        if version == 0:
+            spinner = st.spinner(self.show_spinner) if self.show_spinner else nullcontext()
+            with spinner:
+                value = self.refresh()
+        elif self.age >= self.ttl:
+            # Missed by the refresher (e.g. it was busy): serve stale, reload behind
+            self.refresh_async()
+
+        # Shallow copy so a session's column assignments never reach the shared frame
+        return value.copy(deep=False) if hasattr(value, "copy") else value
+
+    def derive(self, key: str, build: Callable[[Any], Any]):
+        """
+        `build(data)` for the current version, computed once and shared until the
+        next swap. `build` gets the shared value itself and must not modify it.
+        """
+        if not self.loaded:
+            self()
+        value, version, _ = self._state
+        cached = self._derived.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        derived = build(value)
+        self._derived[key] = (version, derived)
+        return derived
+
+    def due(self) -> bool:
+        return self.loaded and self.age >= self.ttl - self.refresh_ahead
+
+    def refresh(self):
+        """Load the data now and swap it in; concurrent callers share one load."""
+        version = self.version
+        with self._load_lock:
+            if self.version != version:
+                # Someone else finished a load while we waited for the lock
+                return self._state[0]
+            value = self.loader()
+            self.swap(value)
+            return value
+
+    def refresh_async(self):
+        if self._refreshing.is_set():
+            return
+        self._refreshing.set()
+
+        def run():
+            try:
+                with background_priority():
+                    self.refresh()
+            except Exception:
+                # Keep serving the previous version; the refresher will retry
+                pass
+            finally:
+                self._refreshing.clear()
+
+        threading.Thread(target=run, name=f"refresh-{self.name}", daemon=True).start()
+
+    def swap(self, value):
+        """
+        Atomically replace the shared value. Swapping in the object already held
+        only renews it, keeping the version (and anything keyed on it) intact.
+        """
+        current, version, _ = self._state
+        if version and value is current:
+            self._state = (current, version, time.monotonic())
+        else:
+            self._state = (value, version + 1, time.monotonic())
+
+    def invalidate(self):
+        """Mark the data as expired; it is reloaded in the background, not on read."""
+        value, version, _ = self._state
+        if version:
+            self._state = (value, version, float("-inf"))
+            self.refresh_async()
+
+
+_datasets: Dict[str, SharedDataset] = {}
+_datasets_lock = threading.Lock()
+_refresher: Optional[threading.Thread] = None
+
+
+def _refresh_loop():
+    while True:
+        time.sleep(REFRESH_INTERVAL)
+        with _datasets_lock:
+            datasets = list(_datasets.values())
+        for dataset in datasets:
+            if dataset.due():
+                dataset.refresh_async()
+
+
+def _ensure_refresher():
+    global _refresher
+    with _datasets_lock:
+        if _refresher is None:
+            _refresher = threading.Thread(
+                target=_refresh_loop, name="dataset-refresher", daemon=True
+            )
+            _refresher.start()
+
+
+def shared_dataset(
+    ttl: float, show_spinner: Optional[str] = None, refresh_ahead: float = 60
+):
+    """
+    Decorator turning a zero-argument loader into a process-wide SharedDataset.
+
+    Datasets are registered by qualified name, so re-running a script that
+    defines one (like app.py on every Streamlit rerun) reuses the existing data.
+    """
+
+    def decorator(loader: Callable[[], Any]) -> SharedDataset:
+        name = f"{loader.__module__}.{loader.__qualname__}"
+        with _datasets_lock:
+            dataset = _datasets.get(name)
+            if dataset is None:
+                dataset = SharedDataset(
+                    name, loader, ttl, refresh_ahead, show_spinner=show_spinner
+                )
+                _datasets[name] = dataset
+            else:
+                dataset.loader = loader
+        _ensure_refresher()
+        return dataset
+
+    return decorator
@@ -0,0 +1,145 @@
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Telegram rejects photo captions longer than this
+CAPTION_LIMIT = 1024
+
+logger = logging.getLogger(__name__)
+
+
+class TelegramNotifier:
+    """
+    Sends one notification to many Telegram chats concurrently over a pooled
+    keep-alive session. A photo is uploaded once; the other chats get the
+    returned file_id instead of the bytes again.
+    """
+
+    def __init__(
+        self,
+        bot_token: str,
+        max_workers: int = 8,
+        timeout: Tuple[float, float] = (5, 30),
+    ):
+        self.base_url = f"https://api.telegram.org/bot{bot_token}"
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.mount(
+            "https://", HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        )
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="telegram"
+        )
+        # Runs send_async jobs; separate so they never wait on their own pool
+        self.dispatcher = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="telegram-dispatch"
+        )
+
+    def _post(self, method: str, data: dict, files: Optional[dict] = None) -> dict:
+        resp = self.session.post(
+            f"{self.base_url}/{method}", data=data, files=files, timeout=self.timeout
+        )
+        resp.raise_for_status()
+        return resp.json()
+
+    def _send_text(self, chat_id: str, message: str) -> dict:
+        return self._post(
+            "sendMessage",
+            {"chat_id": chat_id, "text": message, "parse_mode": "Markdown"},
+        )
+
+    def _send_photo(
+        self, chat_id: str, photo, caption: Optional[str], filename: str
+    ) -> dict:
+        data = {"chat_id": chat_id}
+        if caption:
+            data.update(caption=caption, parse_mode="Markdown")
+        if isinstance(photo, str):
+            # file_id of a photo Telegram already has
+            data["photo"] = photo
+            return self._post("sendPhoto", data)
+        return self._post("sendPhoto", data, files={"photo": (filename, photo)})
+
+    def send(
+        self,
+        chat_ids: List[str],
+        message: str,
+        photo: Optional[bytes] = None,
+        filename: str = "image.jpg",
+    ) -> Tuple[Dict[str, bool], Dict[str, str]]:
+        """
+        Notify every chat; returns (success per chat, error text per failed chat).
+        With a photo the message goes out as its caption when it fits, so each
+        chat costs a single request.
+        """
+        results = {chat_id: True for chat_id in chat_ids}
+        errors: Dict[str, str] = {}
+
+        def record(chat_id, future):
+            try:
+                future.result()
+            except Exception as e:
+                results[chat_id] = False
+                errors[chat_id] = str(e)
+
+        if not chat_ids:
+            return results, errors
+
+        caption = message if len(message) <= CAPTION_LIMIT else None
+        futures = []
+        if photo is None or caption is None:
+            futures += [
+                (chat_id, self.executor.submit(self._send_text, chat_id, message))
+                for chat_id in chat_ids
+            ]
+
+        if photo is not None:
+            # Upload to the first chat, then reuse Telegram's file_id for the rest
+            first, rest = chat_ids[0], chat_ids[1:]
+            file_id = None
+            try:
+                sent = self._send_photo(first, photo, caption, filename)
+                file_id = sent["result"]["photo"][-1]["file_id"]
+            except Exception as e:
+                results[first] = False
+                errors[first] = str(e)
+            futures += [
+                (
+                    chat_id,
+                    self.executor.submit(
+                        self._send_photo, chat_id, file_id or photo, caption, filename
+                    ),
+                )
+                for chat_id in rest
+            ]
+
+        for chat_id, future in futures:
+            record(chat_id, future)
+        return results, errors
+
+    def send_async(
+        self,
+        chat_ids: List[str],
+        message: str,
+        attachment: Optional[Callable[[], Tuple[Optional[bytes], str]]] = None,
+    ) -> Future:
+        """
+        `send` on a background thread, so the caller never waits on Telegram.
+        `attachment()` runs there as well and returns (photo, filename), which
+        lets it wait for an image still being prepared. Failed chats are
+        logged; the Future holds what `send` returned.
+        """
+
+        def run():
+            photo, filename = attachment() if attachment else (None, "image.jpg")
+            results, errors = self.send(
+                chat_ids, message, photo=photo, filename=filename
+            )
+            for chat_id, error in errors.items():
+                logger.warning("Telegram message to chat %s failed: %s", chat_id, error)
+            return results, errors
+
+        return self.dispatcher.submit(run)